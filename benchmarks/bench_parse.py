@@ -0,0 +1,136 @@
+# Times the bpy-free parsing layer on synthetic files
+#   python benchmarks/bench_parse.py --vertices 10000,200000 --strips both --normals both
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import itertools
+import tracemalloc
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+from io_import_hedgehog_engine import he2_parse
+from he2_synth import write_pair
+
+Stages = ("header","indices","vertices","faces","skeleton","total")
+
+class StageClock:
+    # Wall time per stage, plus peak traced allocation per stage when Memory is set
+    def __init__(self,Memory):
+        self.Memory = Memory
+        self.Seconds = dict.fromkeys(Stages,0.0)
+        self.Peak = dict.fromkeys(Stages,0)
+    
+    def run(self,Stage,Function,*Args):
+        if self.Memory:
+            tracemalloc.reset_peak()
+            Base = tracemalloc.get_traced_memory()[0]
+        Start = time.perf_counter()
+        Result = Function(*Args)
+        self.Seconds[Stage] += time.perf_counter()-Start
+        if self.Memory:
+            self.Peak[Stage] = max(self.Peak[Stage],tracemalloc.get_traced_memory()[1]-Base)
+        return Result
+
+def parse_stages(Clock,FilePath,SkelPath,Options,Threads=1):
+    # Same steps as read_model_file, split so each one can be timed on its own
+    with he2_parse.HedgeReader(FilePath,'>') as Model:
+        def headers():
+            ModelInfo = he2_parse.read_model_info(Model)
+            he2_parse.read_boneref_names(Model,ModelInfo["BoneCount"],ModelInfo["BoneNameOffset"])
+            return ModelInfo,[he2_parse.read_mesh_header(Model,x) for x in ModelInfo["MeshHeaders"]]
+        ModelInfo,Headers = Clock.run("header",headers)
+        for Header in Headers:
+            FaceArray = Clock.run("indices",he2_parse.read_faces,Model,Header,Options["import_strips"])
+            Clock.run("vertices",he2_parse.decode_vertices,Model,Header["VertChunkOffset"],Header["VertCount"],
+                      Header["VertSize"],Header["VertData"])
+            Clock.run("faces",he2_parse.filter_faces,FaceArray,Header["VertCount"])
+    Clock.run("skeleton",he2_parse.read_skeleton,SkelPath,Options["use_yx_orientation"])
+    def total():
+        he2_parse.read_model_file(FilePath,Options,Threads=Threads)
+        he2_parse.read_skeleton(SkelPath,Options["use_yx_orientation"])
+    Clock.run("total",total)
+
+def bench_case(Folder,Case,Repeat,Threads=1):
+    Name = "case_%d" % abs(hash(tuple(sorted(Case.items()))))
+    FilePath,Stats = write_pair(Folder,Name,**Case)
+    Options = {"import_strips":Case["Strips"],"use_yx_orientation":False}
+    
+    Best = None
+    for x in range(Repeat):
+        Clock = StageClock(False)
+        parse_stages(Clock,FilePath,he2_parse.skeleton_path(FilePath),Options,Threads)
+        if Best is None or Clock.Seconds["total"] < Best.Seconds["total"]:
+            Best = Clock
+    # Separate pass for memory, tracemalloc slows everything it watches
+    tracemalloc.start()
+    Memory = StageClock(True)
+    parse_stages(Memory,FilePath,he2_parse.skeleton_path(FilePath),Options)
+    tracemalloc.stop()
+    
+    Result = {"Case":Case,"Threads":Threads,"Stats":Stats,"Stages":{}}
+    for Stage in Stages:
+        Seconds = max(Best.Seconds[Stage],1e-9)
+        Result["Stages"][Stage] = {"Seconds":Best.Seconds[Stage],"PeakBytes":Memory.Peak[Stage],
+                                   "VerticesPerSecond":Stats["Vertices"]/Seconds,"TrianglesPerSecond":Stats["Triangles"]/Seconds}
+    os.remove(FilePath)
+    os.remove(he2_parse.skeleton_path(FilePath))
+    return Result
+
+def int_list(Text):
+    return [int(x) for x in Text.split(",")]
+
+def choice_list(Text,Names):
+    # "both" expands to every value, otherwise a comma list of names
+    if Text == "both":
+        return list(Names.values())
+    return [Names[x] for x in Text.split(",")]
+
+def print_result(Result):
+    Case = Result["Case"]
+    print("%d verts / %d tris in %d submeshes, %s, %s normals, %d UV, %d weights, %d bones" % (
+        Result["Stats"]["Vertices"],Result["Stats"]["Triangles"],Result["Stats"]["Submeshes"],
+        "strips" if Case["Strips"] else "list",
+        "10-bit" if Case["TenBitNormals"] else "float",
+        Case["UVSets"],Case["Weights"],Case["BoneCount"]))
+    for Stage in Stages:
+        Entry = Result["Stages"][Stage]
+        print("  %-9s %9.2f ms %12.0f verts/s %12.0f tris/s %9.2f MB peak" % (
+            Stage,Entry["Seconds"]*1000,Entry["VerticesPerSecond"],Entry["TrianglesPerSecond"],Entry["PeakBytes"]/(1<<20)))
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(description="Benchmark the Hedgehog Engine 2 parsing layer on synthetic files.")
+    Parser.add_argument("--vertices",default="10000,100000",help="comma list of vertex counts per file")
+    Parser.add_argument("--strips",default="both",help="list, strip or both")
+    Parser.add_argument("--normals",default="both",help="float, tenbit or both")
+    Parser.add_argument("--uv-sets",default="1,4",help="comma list, 1 to 4")
+    Parser.add_argument("--weights",default="4,8",help="comma list, 4 or 8")
+    Parser.add_argument("--bones",default="60,300",help="comma list, above 255 switches to u16 bone indices")
+    Parser.add_argument("--groups",type=int,default=1,help="mesh groups per file")
+    Parser.add_argument("--threads",type=int,default=1,help="submesh decoding threads for the total, 0 is one per core")
+    Parser.add_argument("--repeat",type=int,default=3,help="runs per case, the fastest is kept")
+    Parser.add_argument("--json",help="also write every result to this file")
+    Args = Parser.parse_args(argv)
+    
+    Matrix = itertools.product(int_list(Args.vertices),
+                               choice_list(Args.strips,{"list":False,"strip":True}),
+                               choice_list(Args.normals,{"float":False,"tenbit":True}),
+                               int_list(Args.uv_sets),int_list(Args.weights),int_list(Args.bones))
+    Results = []
+    with tempfile.TemporaryDirectory() as Folder:
+        for VertCount,Strips,TenBitNormals,UVSets,Weights,BoneCount in Matrix:
+            Case = {"VertCount":VertCount,"Strips":Strips,"TenBitNormals":TenBitNormals,"UVSets":UVSets,
+                    "Weights":Weights,"BoneCount":BoneCount,"Groups":Args.groups}
+            Results.append(bench_case(Folder,Case,Args.repeat,Args.threads))
+            print_result(Results[-1])
+    
+    if Args.json:
+        with open(Args.json,'w') as f:
+            json.dump(Results,f,indent=1)
+    return Results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Writes synthetic Hedgehog Engine 2 .model / .skl.pxd files with the layout the importer reads
+import os
+import math
+import struct
+import numpy as np
+
+MaxSubmeshVerts = 0xFFFF #u16 indices, 0xFFFF doubles as the strip restart
+
+class Blob:
+    def __init__(self):
+        self.Data = bytearray()
+    
+    def alloc(self,Raw,Align=4):
+        while len(self.Data) % Align:
+            self.Data.append(0)
+        Offset = len(self.Data)
+        self.Data += Raw
+        return Offset
+    
+    def put(self,Offset,Fmt,*Values):
+        struct.pack_into(Fmt,self.Data,Offset,*Values)
+
+def grid_size(VertCount):
+    Width = max(2,int(math.sqrt(VertCount)))
+    return Width,max(2,VertCount//Width)
+
+def split_counts(VertCount):
+    Counts = []
+    while VertCount > 0:
+        Counts.append(min(VertCount,MaxSubmeshVerts-1))
+        VertCount -= Counts[-1]
+    return Counts or [4]
+
+def vertex_layout(TenBitNormals,UVSets,Weights,BigBones,Color):
+    # (offset, element format, element index) in file order
+    Layout = [(0,0x2A23B9,0)]
+    Offset = 12
+    if TenBitNormals:
+        Layout.append((Offset,0x2A2187,0x30000))
+        Offset += 4
+    else:
+        Layout.append((Offset,0x2A23B9,0x30000))
+        Offset += 12
+    for x in range(UVSets):
+        Layout.append((Offset,0x2C235F,0x50000+0x100*x))
+        Offset += 4
+    if Color:
+        Layout.append((Offset,0x1A2086,0xA0000))
+        Offset += 4
+    for x in range(Weights//4):
+        Layout.append((Offset,0x1A225A if BigBones else 0x1A2286,0x20000+0x100*x))
+        Offset += 8 if BigBones else 4
+        Layout.append((Offset,0x1A2044,0x10000+0x100*x))
+        Offset += 4
+    return Layout,(Offset+3)//4*4
+
+def grid_indices(Width,Height,Strips):
+    if Strips:
+        Rows = np.arange(Height-1)[:,None]*Width+np.arange(Width)[None,:]
+        Rows = np.stack((Rows,Rows+Width),axis=2).reshape(Height-1,-1)
+        Rows = np.concatenate((Rows,np.full((Height-1,1),0xFFFF)),axis=1).ravel()[:-1]
+        return Rows.astype('>u2')
+    Row,Col = np.meshgrid(np.arange(Height-1),np.arange(Width-1),indexing='ij')
+    A = (Row*Width+Col).ravel()
+    return np.stack((A,A+Width,A+1,A+1,A+Width,A+Width+1),axis=1).ravel().astype('>u2')
+
+def write_vertices(Rng,Layout,VertSize,Width,Height,BoneRefCount,BigBones):
+    VertCount = Width*Height
+    Buffer = np.zeros((VertCount,VertSize),dtype=np.uint8)
+    def put(Offset,Array):
+        Raw = np.ascontiguousarray(Array).view(np.uint8).reshape(VertCount,-1)
+        Buffer[:,Offset:Offset+Raw.shape[1]] = Raw
+    
+    X,Y = np.meshgrid(np.arange(Width),np.arange(Height))
+    put(0,np.stack((X.ravel()*0.1,Y.ravel()*0.1,Rng.normal(size=VertCount)*0.01),axis=1).astype('>f4'))
+    for Offset,Format,Index in Layout[1:]:
+        if Index == 0x30000 and Format == 0x2A2187:
+            Normal = Rng.normal(size=(VertCount,3))
+            Normal = np.round(Normal/np.abs(Normal).max(axis=1,keepdims=True)*511).astype(np.int64) & 0x3FF
+            put(Offset,(Normal[:,0]|(Normal[:,1]<<10)|(Normal[:,2]<<20)).astype('>u4'))
+        elif Index == 0x30000:
+            put(Offset,Rng.normal(size=(VertCount,3)).astype('>f4'))
+        elif Index & 0xFF0000 == 0x50000:
+            put(Offset,Rng.random((VertCount,2)).astype('>f2'))
+        elif Index == 0xA0000:
+            put(Offset,Rng.integers(0,256,(VertCount,4),dtype=np.uint8))
+        elif Index & 0xFF0000 == 0x20000:
+            put(Offset,Rng.integers(0,BoneRefCount,(VertCount,4)).astype('>u2' if BigBones else 'u1'))
+        elif Index & 0xFF0000 == 0x10000:
+            Weight = Rng.integers(0,64,(VertCount,4))
+            Weight[:,0] = 255-Weight[:,1:].sum(axis=1)
+            put(Offset,Weight.astype('u1'))
+    return Buffer.tobytes()
+
+def write_model(FilePath,VertCount=10000,Strips=False,TenBitNormals=False,UVSets=1,Weights=4,BoneCount=60,Groups=1,Color=True,Seed=0):
+    # VertCount is the total per file, split over as many submeshes as u16 indices need
+    Rng = np.random.default_rng(Seed)
+    BigBones = BoneCount > 255
+    BoneRefCount = BoneCount if BigBones else min(BoneCount,64)
+    Layout,VertSize = vertex_layout(TenBitNormals,UVSets,Weights,BigBones,Color)
+    
+    File = Blob()
+    File.alloc(bytes(0x10))
+    File.put(0x8,'>I',0x10)
+    File.alloc(struct.pack('>I',0x14))
+    Info = File.alloc(bytes(0xC+7*4))
+    BoneNameOffset = File.alloc(bytes(4*BoneCount))
+    for x in range(BoneCount):
+        Name = File.alloc(b"Bone_%03d\0" % x)
+        Record = File.alloc(struct.pack('>II',0,Name-0x10))
+        File.put(BoneNameOffset+4*x,'>I',Record-0x10)
+    
+    Stats = {"Vertices":0,"Triangles":0,"Submeshes":0,"Bytes":0}
+    MeshJump1 = File.alloc(bytes(4*Groups))
+    for Group in range(Groups):
+        Counts = split_counts(VertCount//Groups)
+        MeshTable = File.alloc(bytes(4*len(Counts)))
+        GroupOffset = File.alloc(struct.pack('>4I',len(Counts),MeshTable-0x10,0,0))
+        File.put(MeshJump1+4*Group,'>I',GroupOffset-0x10)
+        for Mesh,Count in enumerate(Counts):
+            Width,Height = grid_size(Count)
+            VertChunk = File.alloc(write_vertices(Rng,Layout,VertSize,Width,Height,BoneRefCount,BigBones))
+            Format = File.alloc(b''.join(struct.pack('>IiI',*Element) for Element in Layout)+struct.pack('>IiI',0xFF,-1,0))
+            Indices = grid_indices(Width,Height,Strips)
+            IndiceOffset = File.alloc(Indices.tobytes())
+            BoneRef = np.sort(Rng.choice(BoneCount,BoneRefCount,replace=False)).astype('>u2' if BigBones else 'u1')
+            BoneRefOffset = File.alloc(BoneRef.tobytes())
+            Material = File.alloc(b"mat_%d_%d\0" % (Group,Mesh))
+            Header = File.alloc(struct.pack('>9I',Material-0x10,len(Indices),IndiceOffset-0x10,Width*Height,VertSize,
+                                            VertChunk-0x10,Format-0x10,BoneRefCount,BoneRefOffset-0x10))
+            File.put(MeshTable+4*Mesh,'>I',Header-0x10)
+            Stats["Vertices"] += Width*Height
+            Stats["Triangles"] += (Width-1)*(Height-1)*2
+            Stats["Submeshes"] += 1
+    File.put(Info+0xC,'>7I',Groups,MeshJump1-0x10,0,0,BoneCount,BoneNameOffset-0x10,0)
+    
+    with open(FilePath,'wb') as f:
+        f.write(File.Data)
+    Stats["Bytes"] = len(File.Data)
+    return Stats
+
+def write_skeleton(FilePath,BoneCount=60,Seed=0):
+    Rng = np.random.default_rng(Seed)
+    File = Blob()
+    File.alloc(bytes(0x90))
+    Parents = np.array([-1]+[Rng.integers(0,x) for x in range(1,BoneCount)],dtype='<i2')
+    ParentOffset = File.alloc(Parents.tobytes())
+    NameTable = File.alloc(bytes(0x10*BoneCount))
+    for x in range(BoneCount):
+        Name = File.alloc(b"Bone_%03d\0" % x)
+        File.put(NameTable+0x10*x,'<I',Name-0x40)
+    
+    Transforms = np.zeros((BoneCount,12),dtype='<f4')
+    Transforms[:,0:3] = Rng.normal(size=(BoneCount,3))*0.1
+    Rotation = Rng.normal(size=(BoneCount,4))
+    Transforms[:,4:8] = Rotation/np.linalg.norm(Rotation,axis=1,keepdims=True)
+    Transforms[:,8:11] = 1
+    TransformOffset = File.alloc(Transforms.tobytes(),16)
+    
+    File.put(0x48,'<I',ParentOffset-0x40)
+    File.put(0x50,'<I',BoneCount)
+    File.put(0x68,'<I',NameTable-0x40)
+    File.put(0x88,'<I',TransformOffset-0x40)
+    with open(FilePath,'wb') as f:
+        f.write(File.Data)
+
+def write_pair(Folder,Name,**Settings):
+    # .model plus the matching .skl.pxd next to it, as the importer expects
+    FilePath = os.path.join(Folder,Name+".model")
+    Stats = write_model(FilePath,**Settings)
+    write_skeleton(os.path.join(Folder,Name+".skl.pxd"),Settings.get("BoneCount",60),Settings.get("Seed",0))
+    return FilePath,Stats
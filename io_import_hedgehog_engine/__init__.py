@@ -0,0 +1,18 @@
+bl_info = {
+    "name": "Hedgehog Engine 2 Import",
+    "author": "Turk",
+    "version": (1, 1, 0),
+    "blender": (2, 82, 0),
+    "location": "File > Import-Export",
+    "description": "A script to import meshes from Hedgehog Engine 2 games",
+    "warning": "",
+    "category": "Import-Export",
+}
+
+def register():
+    from . import he2_import
+    he2_import.register()
+    
+def unregister():
+    from . import he2_import
+    he2_import.unregister()
@@ -0,0 +1,169 @@
+# Headless conversion of a whole directory tree of .model/.terrain-model files:
+#   blender --background --python io_import_hedgehog_engine/batch_convert.py -- <input dir> <output dir> [options]
+# Progress is kept in <output dir>/he2_manifest.json plus a he2_manifest.jsonl journal appended to after every file,
+# so a crashed or interrupted run resumes where it stopped.
+import sys
+import os
+import json
+import time
+import argparse
+import bpy
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import io_import_hedgehog_engine
+from io_import_hedgehog_engine.he2_parse import skeleton_path, find_models
+
+ManifestName = "he2_manifest.json"
+JournalName = "he2_manifest.jsonl" # one line per entry change since the manifest was last written
+
+def parse_args(argv):
+    Parser = argparse.ArgumentParser(prog="batch_convert.py",description="Convert Hedgehog Engine 2 models without the UI")
+    Parser.add_argument("input",help="directory that is searched recursively for models")
+    Parser.add_argument("output",help="directory that receives one file per model, mirroring the input tree")
+    Parser.add_argument("--format",choices=("blend","glb","gltf"),default="blend")
+    Parser.add_argument("--strips",action="store_true",help="same as the importer's Use Strips")
+    Parser.add_argument("--yx-orientation",action="store_true",help="same as Use YX Bone Orientation")
+    Parser.add_argument("--bone-lengths",action="store_true",help="same as Use Bone Lengths")
+    Parser.add_argument("--aligned-scale",action="store_true",help="same as Aligned Scale Inheritance")
+    Parser.add_argument("--weld",choices=("none","position","attributes"),default="none",help="same as Weld Vertices")
+    Parser.add_argument("--merge",action="store_true",help="same as Merge Submeshes, one object per model")
+    Parser.add_argument("--instance",action="store_true",help="same as Instance Duplicate Meshes, within one model")
+    Parser.add_argument("--cache",action="store_true",help="same as Cache Decoded Files")
+    Parser.add_argument("--profile",action="store_true",help="same as Profile Import, writes a .trace.json next to every model")
+    Parser.add_argument("--force",action="store_true",help="convert again even when the output is up to date")
+    Parser.add_argument("--max-attempts",type=int,default=2,help="give up on a file after it crashed Blender this many times")
+    return Parser.parse_args(argv)
+
+def input_mtimes(FilePath):
+    Inputs = {os.path.basename(FilePath):os.path.getmtime(FilePath)}
+    SkelPath = skeleton_path(FilePath)
+    if os.path.exists(SkelPath):
+        Inputs[os.path.basename(SkelPath)] = os.path.getmtime(SkelPath)
+    return Inputs
+
+def import_options(Args):
+    # Operator settings that change the converted file, stored per manifest entry
+    return {"import_strips":Args.strips,
+            "use_yx_orientation":Args.yx_orientation,
+            "get_bone_lengths":Args.bone_lengths,
+            "aligned_scale":Args.aligned_scale,
+            "merge_submeshes":Args.merge,
+            "weld_vertices":Args.weld.upper(),
+            "instance_duplicates":Args.instance}
+
+def load_manifest(ManifestPath,JournalPath):
+    # The last written manifest with every journal line after it applied, lines hold whole entries
+    Manifest = {"files":{}}
+    if os.path.exists(ManifestPath):
+        with open(ManifestPath,"r",encoding='utf-8') as f:
+            Manifest = json.load(f)
+    if os.path.exists(JournalPath):
+        with open(JournalPath,"r",encoding='utf-8') as f:
+            for Line in f:
+                try:
+                    Change = json.loads(Line)
+                except ValueError: # cut short by a crash
+                    continue
+                Manifest["files"][Change["path"]] = Change["entry"]
+    return Manifest
+
+def save_manifest(ManifestPath,JournalPath,Manifest):
+    # Rewrites the whole manifest and empties the journal, only at the start and end of a run
+    TmpPath = ManifestPath+".tmp"
+    with open(TmpPath,"w",encoding='utf-8') as f:
+        json.dump(Manifest,f,indent=1,sort_keys=True)
+    os.replace(TmpPath,ManifestPath) # a crash never leaves a half written manifest
+    if os.path.exists(JournalPath): # a crash before this only replays entries the manifest already has
+        os.remove(JournalPath)
+
+def journal_entry(Journal,RelPath,Entry):
+    Journal.write(json.dumps({"path":RelPath,"entry":Entry},sort_keys=True)+"\n")
+    Journal.flush() # on disk before Blender gets a chance to crash on the next file
+
+def import_model(FilePath,Args):
+    bpy.ops.wm.read_homefile(use_empty=True)
+    Result = bpy.ops.custom_import_scene.hedgeeng(
+        filepath=FilePath,
+        files=[{"name":os.path.basename(FilePath)}],
+        **import_options(Args),
+        use_cache=Args.cache,
+        profile_import=Args.profile,
+        )
+    if 'FINISHED' not in Result:
+        raise RuntimeError("import was cancelled")
+    return sum(len(Mesh.vertices) for Mesh in bpy.data.meshes)
+
+def export_model(OutPath,Format):
+    os.makedirs(os.path.dirname(OutPath),exist_ok=True)
+    if Format == "blend":
+        bpy.ops.wm.save_as_mainfile(filepath=OutPath,check_existing=False,copy=True)
+    else:
+        bpy.ops.export_scene.gltf(filepath=OutPath,export_format='GLB' if Format == "glb" else 'GLTF_SEPARATE')
+
+def convert(Args):
+    InputDir = os.path.abspath(Args.input)
+    OutputDir = os.path.abspath(Args.output)
+    os.makedirs(OutputDir,exist_ok=True)
+    ManifestPath = os.path.join(OutputDir,ManifestName)
+    JournalPath = os.path.join(OutputDir,JournalName)
+    Manifest = load_manifest(ManifestPath,JournalPath)
+    save_manifest(ManifestPath,JournalPath,Manifest) # fold in what an interrupted run left in the journal
+    Journal = open(JournalPath,"a",encoding='utf-8')
+    Counts = {"done":0,"skipped":0,"failed":0}
+    Vertices = 0
+    StartTime = time.perf_counter()
+    Options = import_options(Args)
+    
+    for FilePath in find_models(InputDir):
+        RelPath = os.path.relpath(FilePath,InputDir)
+        OutPath = os.path.join(OutputDir,RelPath+"."+Args.format)
+        Inputs = input_mtimes(FilePath)
+        Entry = Manifest["files"].get(RelPath,{})
+        
+        if Entry.get("inputs") != Inputs or Entry.get("options") != Options or Args.force:
+            Entry = {"attempts":0}
+        elif Entry.get("status") == "done" and os.path.exists(OutPath):
+            Counts["skipped"] += 1
+            continue
+        elif Entry.get("status") in ("running","failed") and Entry.get("attempts",0) >= Args.max_attempts:
+            if Entry["status"] == "running": # Blender died on it last time
+                Entry.update(status="failed",error="crashed during import")
+                journal_entry(Journal,RelPath,Entry)
+            Counts["skipped"] += 1
+            continue
+        
+        Entry.update(status="running",inputs=Inputs,options=Options,attempts=Entry.get("attempts",0)+1,output=os.path.relpath(OutPath,OutputDir))
+        Entry.pop("error",None)
+        Manifest["files"][RelPath] = Entry
+        journal_entry(Journal,RelPath,Entry)
+        
+        FileStart = time.perf_counter()
+        try:
+            FileVertices = import_model(FilePath,Args)
+            export_model(OutPath,Args.format)
+        except Exception as Error:
+            Entry.update(status="failed",error=str(Error).strip())
+            Counts["failed"] += 1
+            print("FAILED %s: %s" % (RelPath,Entry["error"]))
+        else:
+            Entry.update(status="done",vertices=FileVertices,seconds=round(time.perf_counter()-FileStart,3))
+            Counts["done"] += 1
+            Vertices += FileVertices
+        journal_entry(Journal,RelPath,Entry)
+    Journal.close()
+    save_manifest(ManifestPath,JournalPath,Manifest)
+    
+    Elapsed = max(time.perf_counter()-StartTime,1e-9)
+    print("Converted %d files (%d skipped, %d failed) in %.1fs: %.2f files/s, %.0f vertices/s" % (
+        Counts["done"],Counts["skipped"],Counts["failed"],Elapsed,Counts["done"]/Elapsed,Vertices/Elapsed))
+    return Counts["failed"] == 0
+
+def main():
+    Args = parse_args(sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else [])
+    if not hasattr(bpy.types,"CUSTOM_IMPORT_SCENE_OT_hedgeeng"):
+        io_import_hedgehog_engine.register()
+    if not convert(Args):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
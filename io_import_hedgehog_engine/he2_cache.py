@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import numpy as np
+from . import bl_info
+
+# Decoded models are stored as one .npz per cache key, arrays as members and everything else in a JSON "meta" member
+
+def cache_key(FilePaths,Options):
+    Hash = hashlib.sha1()
+    Hash.update(json.dumps([bl_info["version"],Options],sort_keys=True).encode('utf-8'))
+    for FilePath in FilePaths:
+        if not os.path.exists(FilePath):
+            Hash.update(b'\0')
+            continue
+        with open(FilePath,"rb") as f:
+            for Chunk in iter(lambda: f.read(1 << 20),b''):
+                Hash.update(Chunk)
+    return Hash.hexdigest()
+
+def load_model(CacheDir,Key):
+    CachePath = os.path.join(CacheDir,Key+".npz")
+    if not os.path.exists(CachePath):
+        return None
+    try:
+        with np.load(CachePath,allow_pickle=False) as Npz:
+            ModelData = unpack_value(json.loads(str(Npz["meta"])),Npz)
+    except Exception: # unreadable entry, parse again and let store_model replace it
+        remove_entry(CachePath)
+        return None
+    try:
+        os.utime(CachePath) # mtime is the LRU clock
+    except OSError: # shared or locked cache, the entry is only evicted a little early
+        pass
+    return ModelData
+
+def store_model(CacheDir,Key,ModelData,SizeLimit):
+    # Returns False when the entry could not be written (full disk, read-only directory), the import goes on without it
+    Arrays = {}
+    Meta = pack_value(ModelData,"a",Arrays)
+    CachePath = os.path.join(CacheDir,Key+".npz")
+    TmpPath = "%s.%d.tmp" % (CachePath,os.getpid())
+    try:
+        os.makedirs(CacheDir,exist_ok=True)
+        with open(TmpPath,"wb") as f:
+            np.savez(f,meta=np.array(json.dumps(Meta)),**Arrays)
+        os.replace(TmpPath,CachePath)
+        evict(CacheDir,SizeLimit)
+    except OSError:
+        try:
+            os.remove(TmpPath)
+        except OSError:
+            pass
+        return False
+    return True
+
+def evict(CacheDir,SizeLimit):
+    Entries = []
+    for Name in os.listdir(CacheDir):
+        if Name.endswith(".npz"):
+            try:
+                Stat = os.stat(os.path.join(CacheDir,Name))
+            except FileNotFoundError: # evicted by another worker
+                continue
+            Entries.append((Stat.st_mtime,Stat.st_size,Name))
+    Total = sum(Entry[1] for Entry in Entries)
+    for Mtime,Size,Name in sorted(Entries):
+        if Total <= SizeLimit:
+            break
+        remove_entry(os.path.join(CacheDir,Name))
+        Total -= Size
+
+def remove_entry(CachePath):
+    # Gone already (another worker evicted it) or not ours to remove, either way the import goes on
+    try:
+        os.remove(CachePath)
+    except OSError:
+        pass
+
+def pack_value(Value,Name,Arrays):
+    if isinstance(Value,np.ndarray):
+        Arrays[Name] = Value
+        return {"array":Name}
+    if isinstance(Value,dict):
+        return {"dict":{Key:pack_value(Item,"%s.%s" % (Name,Key),Arrays) for Key,Item in Value.items()}}
+    if isinstance(Value,(list,tuple)):
+        return {"list":[pack_value(Item,"%s.%d" % (Name,x),Arrays) for x,Item in enumerate(Value)]}
+    return {"value":Value}
+
+def unpack_value(Meta,Npz):
+    if "array" in Meta:
+        return Npz[Meta["array"]]
+    if "dict" in Meta:
+        return {Key:unpack_value(Item,Npz) for Key,Item in Meta["dict"].items()}
+    if "list" in Meta:
+        return [unpack_value(Item,Npz) for Item in Meta["list"]]
+    return Meta["value"]
@@ -0,0 +1,137 @@
+import os
+import json
+import sqlite3
+from .he2_parse import HedgeReader, HedgeFormatError, read_model_info, read_mesh_header, read_boneref_names, skeleton_path, find_models
+
+# Header-only index of a game directory: what is in every model, without decoding any vertex
+
+CommitInterval = 200 # files read between commits, an interrupted scan keeps everything up to the last one
+
+Schema = '''
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, root TEXT, mtime REAL, size INTEGER, skeleton TEXT,
+    bone_count INTEGER, group_count INTEGER, mesh_count INTEGER, vert_count INTEGER, indice_count INTEGER, error TEXT);
+CREATE TABLE IF NOT EXISTS meshes (path TEXT, submesh INTEGER, mesh_group INTEGER, material TEXT,
+    vert_count INTEGER, indice_count INTEGER, vert_size INTEGER, vert_format TEXT);
+CREATE TABLE IF NOT EXISTS bones (path TEXT, name TEXT);
+CREATE INDEX IF NOT EXISTS meshes_path ON meshes (path);
+CREATE INDEX IF NOT EXISTS meshes_material ON meshes (material);
+CREATE INDEX IF NOT EXISTS bones_path ON bones (path);
+CREATE INDEX IF NOT EXISTS bones_name ON bones (name);
+'''
+
+def open_catalog(DbPath):
+    Db = sqlite3.connect(DbPath)
+    Db.executescript(Schema)
+    return Db
+
+def read_catalog_entry(FilePath):
+    # The same tables the importer walks, minus the vertex and index data
+    Entry = {"skeleton":skeleton_path(FilePath) if os.path.exists(skeleton_path(FilePath)) else None,"meshes":[],"bones":[]}
+    with HedgeReader(FilePath,'>') as Model:
+        ModelInfo = read_model_info(Model)
+        Entry["bones"] = read_boneref_names(Model,ModelInfo["BoneCount"],ModelInfo["BoneNameOffset"])
+        for Submesh,(MeshHeader,MeshGroup) in enumerate(zip(ModelInfo["MeshHeaders"],ModelInfo["MeshGroups"])):
+            Header = read_mesh_header(Model,MeshHeader)
+            Entry["meshes"].append((Submesh,MeshGroup,Header["MaterialName"],Header["VertCount"],Header["IndiceCount"],
+                                    Header["VertSize"],json.dumps(sorted(Header["VertData"].items()))))
+    Entry["group_count"] = len(set(ModelInfo["MeshGroups"]))
+    return Entry
+
+def scan(DbPath,Root,Progress=None):
+    # Re-reads only files whose mtime or size changed since the last scan, drops files that are gone.
+    # Returns {"added", "updated", "removed", "unchanged", "failed"} counts
+    Root = os.path.realpath(Root)
+    Counts = dict.fromkeys(("added","updated","removed","unchanged","failed"),0)
+    Db = open_catalog(DbPath)
+    try:
+        Known = {Path:(Mtime,Size) for Path,Mtime,Size in Db.execute("SELECT path, mtime, size FROM files WHERE root = ?",(Root,))}
+        Seen = set()
+        Stored = 0
+        for FilePath in find_models(Root):
+            try:
+                Stat = os.stat(FilePath)
+            except OSError: # removed or unreadable since the walk listed it, dropped like a removed file
+                Counts["failed"] += 1
+                continue
+            Seen.add(FilePath)
+            if Known.get(FilePath) == (Stat.st_mtime,Stat.st_size):
+                Counts["unchanged"] += 1
+                continue
+            Counts["updated" if FilePath in Known else "added"] += 1
+            if store_entry(Db,Root,FilePath,Stat):
+                Counts["failed"] += 1
+            Stored += 1
+            if Stored % CommitInterval == 0:
+                Db.commit()
+            if Progress:
+                Progress(FilePath)
+        for FilePath in set(Known)-Seen:
+            delete_entry(Db,FilePath)
+            Counts["removed"] += 1
+        Db.commit()
+    finally:
+        Db.close()
+    return Counts
+
+def store_entry(Db,Root,FilePath,Stat):
+    # Returns the read error, None when the file was indexed
+    delete_entry(Db,FilePath)
+    try:
+        Entry = read_catalog_entry(FilePath)
+        Error = None
+    except HedgeFormatError as ReadError:
+        Entry,Error = None,str(ReadError)
+    except Exception as ReadError:
+        Entry,Error = None,"%s: %s" % (os.path.basename(FilePath),ReadError)
+    if Entry is None: # kept so unchanged broken files are not read again on every scan
+        Db.execute("INSERT INTO files (path, root, mtime, size, error) VALUES (?,?,?,?,?)",(FilePath,Root,Stat.st_mtime,Stat.st_size,Error))
+        return Error
+    Db.execute("INSERT INTO files VALUES (?,?,?,?,?,?,?,?,?,?,?)",(
+        FilePath,Root,Stat.st_mtime,Stat.st_size,Entry["skeleton"],len(Entry["bones"]),Entry["group_count"],len(Entry["meshes"]),
+        sum(x[3] for x in Entry["meshes"]),sum(x[4] for x in Entry["meshes"]),None))
+    Db.executemany("INSERT INTO meshes VALUES (?,?,?,?,?,?,?,?)",[(FilePath,*Mesh) for Mesh in Entry["meshes"]])
+    Db.executemany("INSERT INTO bones VALUES (?,?)",[(FilePath,Name) for Name in Entry["bones"]])
+    return None
+
+def delete_entry(Db,FilePath):
+    for Table in ("files","meshes","bones"):
+        Db.execute("DELETE FROM %s WHERE path = ?" % Table,(FilePath,))
+
+def glob_pattern(Text):
+    # Plain text matches anywhere, text with wildcards is used as is
+    if any(x in Text for x in "*?["):
+        return Text
+    return "*%s*" % Text
+
+def query(DbPath,Name="",Material="",Bone="",MinVerts=0,MaxVerts=0,Limit=500):
+    # Name (the file path), Material and Bone are glob patterns, an empty one matches everything.
+    # Vertex limits apply to the file total, 0 means no limit
+    Where = ["error IS NULL"]
+    Args = []
+    if Name:
+        Where.append("path GLOB ?")
+        Args.append(glob_pattern(Name))
+    if Material:
+        Where.append("path IN (SELECT path FROM meshes WHERE material GLOB ?)")
+        Args.append(glob_pattern(Material))
+    if Bone:
+        Where.append("path IN (SELECT path FROM bones WHERE name GLOB ?)")
+        Args.append(glob_pattern(Bone))
+    if MinVerts:
+        Where.append("vert_count >= ?")
+        Args.append(MinVerts)
+    if MaxVerts:
+        Where.append("vert_count <= ?")
+        Args.append(MaxVerts)
+    Db = open_catalog(DbPath)
+    try:
+        Rows = Db.execute("SELECT path, skeleton, bone_count, mesh_count, vert_count, indice_count FROM files WHERE %s ORDER BY path LIMIT ?" % " AND ".join(Where),
+                          Args+[Limit]).fetchall()
+        Results = []
+        for Path,Skeleton,BoneCount,MeshCount,VertCount,IndiceCount in Rows:
+            Materials = [x[0] for x in Db.execute("SELECT DISTINCT material FROM meshes WHERE path = ? ORDER BY submesh",(Path,))]
+            Results.append({"path":Path,"skeleton":Skeleton,"bone_count":BoneCount,"mesh_count":MeshCount,
+                            "vert_count":VertCount,"indice_count":IndiceCount,"materials":Materials})
+        return Results
+    finally:
+        Db.close()
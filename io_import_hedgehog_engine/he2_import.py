@@ -0,0 +1,1119 @@
+import bpy
+import os
+import json
+import time
+import threading
+import mathutils
+import numpy as np
+from bpy.props import (BoolProperty,
+                       FloatProperty,
+                       IntProperty,
+                       StringProperty,
+                       EnumProperty,
+                       CollectionProperty,
+                       PointerProperty
+                       )
+from bpy_extras.io_utils import ImportHelper
+from .he2_parse import (HedgeFormatError, parse_files, parse_in_thread, parse_proxies, parse_index_list,
+                        read_model_submeshes, read_skeleton_file, skeleton_key, stream_files)
+from .he2_profile import ImportProfile, NullProfile
+from . import he2_catalog
+
+MeshInstances = {} # submesh hash -> {"Mesh", "Groups", "Bytes"} of every mesh built this session
+WatchedFiles = {} # source path -> [mtime at the last import, mtime seen on the last check]
+WatchInterval = 1.0
+ReimportSettings = ("import_strips","use_yx_orientation","get_bone_lengths","get_bone_lengths_min","get_bone_lengths_max",
+                    "get_bone_lengths_end","get_bone_lengths_custom","aligned_scale","mesh_groups","submeshes",
+                    "material_filter","import_attributes","weld_vertices","merge_submeshes","instance_duplicates")
+
+class HedgeEngineTest(bpy.types.Operator, ImportHelper):
+    bl_idname = "custom_import_scene.hedgeeng"
+    bl_label = "Import"
+    bl_options = {'PRESET', 'UNDO'}
+    filename_ext = ".model"
+    filter_glob: StringProperty(
+            default="*.model;*.terrain-model",
+            options={'HIDDEN'},
+            )
+    filepath: StringProperty(subtype='FILE_PATH',)
+    files: CollectionProperty(type=bpy.types.PropertyGroup)
+    
+    import_strips: BoolProperty(
+            name="Use Strips",
+            description="Import mesh using strip notation",
+            default=False,
+            )
+    use_yx_orientation: BoolProperty(
+            name="Use YX Bone Orientation",
+            description="Reorient bones from XZ to YX to make bones coincide with limbs and enable mirror support",
+            default=False,
+            )
+    get_bone_lengths: BoolProperty(
+            name="Use Bone Lengths",
+            description="Calculate and apply approximate bone lengths",
+            default=False,
+            )
+    
+    def update_min_length(self, context):
+        if self.get_bone_lengths_min > self.get_bone_lengths_max:
+            self.get_bone_lengths_min = self.get_bone_lengths_max
+    def update_max_length(self, context):
+        if self.get_bone_lengths_min > self.get_bone_lengths_max:
+            self.get_bone_lengths_max = self.get_bone_lengths_min
+            
+    get_bone_lengths_min: FloatProperty(
+            name="Minimum Length",
+            description="Calculated bone length will not exceed any lower than this value",
+            default=0.025,
+            min=0.01,
+            soft_max=1.0,
+            update=update_max_length,
+            )
+    get_bone_lengths_max: FloatProperty(
+            name="Maximum Length",
+            description="Calculated bone length will not exceed any higher than this value",
+            default=0.600,
+            min=0.01,
+            soft_max=1.0,
+            update=update_min_length,
+            )
+    get_bone_lengths_end: EnumProperty(
+            items=[
+                ("prevLength", "Parent Length", "Set end bone lengths to be the same as their respective parents", 1),
+                ("minLength", "Minimum length", "Set end bone lengths to the minimum", 2),
+                ("customLength", "Custom length", "Set end bone lengths to specified value", 3),
+                ],
+            name="End Bone Length",
+            description="Determines how the end bones' lengths will be determined",
+            default="prevLength",
+            )
+    get_bone_lengths_custom: FloatProperty(
+            name="End Bone Length",
+            description="End bone length",
+            default=0.100,
+            min=0.01,
+            soft_max=1.0,
+            )
+    aligned_scale: BoolProperty(
+            name="Aligned Scale Inheritance",
+            description="Set bone scale inheritance mode to \"Aligned,\" which is the scale mode used in Frontiers",
+            default=False,
+            )
+    mesh_groups: StringProperty(
+            name="Mesh Groups",
+            description="Only import these mesh groups, comma separated indices and ranges like 0,2-3. Empty imports all",
+            default="",
+            )
+    submeshes: StringProperty(
+            name="Submeshes",
+            description="Only import these submeshes, counted across all mesh groups, comma separated indices and ranges like 0,2-3. Empty imports all",
+            default="",
+            )
+    material_filter: StringProperty(
+            name="Materials",
+            description="Only import submeshes whose material matches one of these comma separated patterns (* and ?). Empty imports all",
+            default="",
+            )
+    import_attributes: EnumProperty(
+            items=[
+                ("UV1", "UV 1", "First UV map"),
+                ("UV2", "UV 2", "Second UV map"),
+                ("UV3", "UV 3", "Third UV map"),
+                ("UV4", "UV 4", "Fourth UV map"),
+                ("NORMAL", "Normals", "Custom split normals"),
+                ("COLOR", "Colors", "Vertex colors"),
+                ("WEIGHTS", "Weights", "Bone weights as vertex groups"),
+                ],
+            name="Attributes",
+            description="Vertex attributes to read, positions are always imported",
+            options={'ENUM_FLAG'},
+            default={"UV1","UV2","UV3","UV4","NORMAL","COLOR","WEIGHTS"},
+            )
+    lazy_proxies: BoolProperty(
+            name="Import As Proxies",
+            description="Only read mesh tables and bounding boxes, every submesh becomes a box that can be loaded later from Object > Load Hedgehog Engine Proxies",
+            default=False,
+            )
+    weld_vertices: EnumProperty(
+            items=[
+                ("NONE", "Off", "Keep every vertex of the file", 1),
+                ("POSITION", "By Position", "Merge vertices at the same position, UVs, colors and normals are kept per face corner", 2),
+                ("ATTRIBUTES", "By Position And Attributes", "Only merge vertices that are identical in every attribute", 3),
+                ],
+            name="Weld Vertices",
+            description="Merge duplicate vertices while importing",
+            default="NONE",
+            )
+    merge_submeshes: BoolProperty(
+            name="Merge Submeshes",
+            description="Build one object per file with a material slot per material instead of one object per submesh",
+            default=False,
+            )
+    instance_duplicates: BoolProperty(
+            name="Instance Duplicate Meshes",
+            description="Submeshes identical to one already imported this session link its mesh data instead of being decoded and built again",
+            default=False,
+            )
+    update_existing: BoolProperty(
+            name="Update Existing Imports",
+            description="Files imported before are updated in place: unchanged submeshes are skipped, changed ones get new mesh data on the same object so transforms and modifiers are kept",
+            default=False,
+            )
+    use_modal: BoolProperty(
+            name="Import In Background",
+            description="Keep Blender responsive while importing, parse on a background thread and build a little at a time. Shows progress in the status bar, ESC cancels and removes everything imported so far",
+            default=False,
+            )
+    use_worker_processes: BoolProperty(
+            name="Parse In Background Processes",
+            description="Parse and decode the selected files in worker processes, only object creation runs in Blender",
+            default=False,
+            )
+    worker_count: IntProperty(
+            name="Workers",
+            description="Number of worker processes, 0 uses one per CPU core",
+            default=0,
+            min=0,
+            soft_max=64,
+            )
+    decode_threads: IntProperty(
+            name="Decode Threads",
+            description="Threads decoding the submeshes of a file while the ones before are built, 0 uses one per CPU core, 1 decodes on the main thread",
+            default=0,
+            min=0,
+            soft_max=64,
+            )
+    use_cache: BoolProperty(
+            name="Cache Decoded Files",
+            description="Keep decoded files on disk and skip parsing when the same file is imported again with the same settings",
+            default=False,
+            )
+    cache_size_limit: IntProperty(
+            name="Cache Size (MB)",
+            description="Least recently used cache entries are removed above this size",
+            default=2048,
+            min=16,
+            )
+    profile_import: BoolProperty(
+            name="Profile Import",
+            description="Time every import stage, report the totals and write a .trace.json next to each imported file",
+            default=False,
+            )
+    profile_memory: BoolProperty(
+            name="Trace Memory",
+            description="Also record allocation peaks per stage (Python 3.9+), noticeably slower",
+            default=False,
+            )
+    
+    def draw(self, context):
+        layout = self.layout
+        uiMeshBox = layout.box()
+        uiMeshBox.label(text="Mesh Settings",icon="MESH_DATA")
+        uiMeshBox.prop(self, "import_strips",)
+        uiMeshBox.prop(self, "lazy_proxies")
+        uiMeshBox.prop(self, "weld_vertices")
+        uiMeshBox.prop(self, "merge_submeshes")
+        uiInstanceRow = uiMeshBox.row()
+        uiInstanceRow.prop(self, "instance_duplicates")
+        uiInstanceRow.enabled = not self.merge_submeshes
+        
+        uiSelectBox = layout.box()
+        uiSelectBox.label(text="Selection",icon="RESTRICT_SELECT_OFF")
+        uiSelectBox.prop(self, "mesh_groups")
+        uiSelectBox.prop(self, "submeshes")
+        uiSelectBox.prop(self, "material_filter")
+        uiSelectBox.prop(self, "import_attributes")
+        
+        
+        uiBoneBox = layout.box()
+        uiBoneBox.label(text="Armature Settings",icon="ARMATURE_DATA")
+        uiBoneBox.prop(self, "use_yx_orientation")
+        uiBoneBox.prop(self, "get_bone_lengths")
+    
+        uiLengthBox = uiBoneBox.box()
+        uiLengthRow = uiLengthBox.row()
+        uiLengthRow.prop(self, "get_bone_lengths_min")
+        uiLengthRow.prop(self, "get_bone_lengths_max")
+        uiLengthBox.prop(self, "get_bone_lengths_end")
+        if self.get_bone_lengths_end == "customLength":
+            uiLengthBox.prop(self, "get_bone_lengths_custom")
+        uiLengthBox.enabled = self.get_bone_lengths
+        uiBoneBox.prop(self, "aligned_scale")
+        
+        uiImportBox = layout.box()
+        uiImportBox.label(text="Import Settings",icon="PREFERENCES")
+        uiImportBox.prop(self, "update_existing")
+        uiImportBox.prop(self, "use_modal")
+        uiImportBox.prop(self, "use_worker_processes")
+        uiWorkerRow = uiImportBox.row()
+        uiWorkerRow.prop(self, "worker_count")
+        uiWorkerRow.enabled = self.use_worker_processes
+        uiThreadRow = uiImportBox.row()
+        uiThreadRow.prop(self, "decode_threads")
+        uiThreadRow.enabled = not self.use_worker_processes
+        uiImportBox.prop(self, "use_cache")
+        uiCacheRow = uiImportBox.row()
+        uiCacheRow.prop(self, "cache_size_limit")
+        uiCacheRow.enabled = self.use_cache
+        uiImportBox.prop(self, "profile_import")
+        uiProfileRow = uiImportBox.row()
+        uiProfileRow.prop(self, "profile_memory")
+        uiProfileRow.enabled = self.profile_import
+
+
+    def parse_options(self):
+        return {"import_strips":self.import_strips,"use_yx_orientation":self.use_yx_orientation,
+                "merge_submeshes":self.merge_submeshes,"weld_vertices":self.weld_vertices,
+                "instance_duplicates":self.instance_duplicates and not self.merge_submeshes,
+                "update_existing":self.update_existing,
+                "mesh_groups":parse_index_list(self.mesh_groups),"submeshes":parse_index_list(self.submeshes),
+                "materials":[x.strip() for x in self.material_filter.split(",") if x.strip()] or None,
+                "attributes":sorted(self.import_attributes)}
+        
+    def execute(self, context):
+        try:
+            self.parse_options()
+        except ValueError:
+            self.report({'ERROR'},"Mesh groups and submeshes take indices and ranges like 0,2-3")
+            return {'CANCELLED'}
+        dirname = os.path.dirname(self.filepath)
+        self._files = [os.path.join(dirname, f.name) for f in self.files]
+        self._profile = ImportProfile(self.profile_memory) if self.profile_import else NullProfile
+        self._collections = [] # every collection this import created, removed again on cancel
+        self._state = {"Files":0,"Submeshes":0,"Vertices":0,"Failed":0,
+                       "Instanced":[0,0], # submeshes, decoded bytes not built again
+                       "Welded":[0,0], # vertices before, after
+                       "Updated":0,"Unchanged":0,"Removed":0} # submeshes of earlier imports
+        
+        if self.use_modal and context.window:
+            self._stop = threading.Event()
+            self._steps = self.import_steps(parse_in_thread(self.import_results(),self._stop))
+            wm = context.window_manager
+            self._timer = wm.event_timer_add(0.05,window=context.window)
+            wm.modal_handler_add(self)
+            wm.progress_begin(0,len(self._files))
+            self.show_progress(context)
+            return {'RUNNING_MODAL'}
+        
+        for _ in self.import_steps(self.import_results(Stream=True)):
+            pass
+        return self.finish_import()
+    
+    def import_results(self,Stream=False):
+        # Stream builds every submesh as soon as its thread decoded it, only for imports that block until done
+        Workers = self.worker_count if self.use_worker_processes else 1
+        Threads = 1 if self.use_worker_processes else self.decode_threads
+        self._cache = None
+        if self.use_cache:
+            self._cache = (bpy.utils.user_resource('DATAFILES',path="hedgehog_engine_cache",create=True),self.cache_size_limit << 20)
+        self._known = set()
+        if self.parse_options()["instance_duplicates"]:
+            self._known.update(Hash for Hash in MeshInstances if instance_mesh(Hash))
+        if self.update_existing and not self.merge_submeshes: # a merged mesh needs every submesh decoded
+            Sources = set(os.path.realpath(FilePath) for FilePath in self._files)
+            self._known.update((obj["he2_source"],obj["he2_submesh"],obj["he2_hash"]) for obj in imported_objects(Sources) if obj.get("he2_hash"))
+        if self.lazy_proxies:
+            return parse_proxies(self._files,self.parse_options())
+        if Stream and Workers == 1 and not self._cache and not self.merge_submeshes:
+            return stream_files(self._files,self.parse_options(),self._profile,self._known,Threads)
+        return parse_files(self._files,self.parse_options(),Workers,worker_executable(),self._cache,self._profile,self._known,Threads)
+    
+    def import_steps(self,Results):
+        # Builds one submesh per step, yields True after work and False while waiting on the parser
+        State = self._state
+        Armatures = {} # skeleton_key -> armature object, shared by every model of the batch using that skeleton
+        for Result in Results:
+            if Result is None:
+                yield False
+                continue
+            FilePath,ModelData,Error = Result
+            if Error is None:
+                try:
+                    self._profile.File = FilePath
+                    if self.lazy_proxies:
+                        with self._profile.stage("build"):
+                            build_proxy_model(self,ModelData,Armatures,self._cache)
+                    else:
+                        for Submesh,(Action,Saved) in enumerate(build_model_steps(self,ModelData,Armatures,self._cache)):
+                            if Action != "Built":
+                                State[Action] += 1
+                            if Action == "Removed":
+                                continue
+                            if Saved is not None:
+                                State["Instanced"][0] += 1
+                                State["Instanced"][1] += Saved
+                            State["Submeshes"] += 1
+                            State["Vertices"] += len(ModelData["Meshes"][Submesh].get("Pos",()))
+                            yield True
+                        if self.parse_options()["instance_duplicates"]:
+                            self._known.update(Mesh["Hash"] for Mesh in ModelData["Meshes"] if instance_mesh(Mesh.get("Hash")))
+                        for Mesh in ModelData["Meshes"]:
+                            if "WeldedFrom" in Mesh:
+                                State["Welded"][0] += Mesh["WeldedFrom"]
+                                State["Welded"][1] += len(Mesh["Pos"])
+                except HedgeFormatError as BuildError: # from a streamed submesh
+                    Error = str(BuildError)
+                except Exception as BuildError:
+                    Error = "%s: %s" % (os.path.basename(FilePath),BuildError)
+            if Error is not None:
+                State["Failed"] += 1
+                self.report({'ERROR'},Error)
+            State["Files"] += 1
+            yield True
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.end_modal(context)
+            self._stop.set()
+            self._steps.close()
+            remove_collections(self._collections)
+            self.report({'WARNING'},"Import cancelled, %d of %d files had been read" % (self._state["Files"],len(self._files)))
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        Deadline = time.perf_counter()+0.04 # keep every slice short enough for the UI to stay smooth
+        try:
+            while time.perf_counter() < Deadline:
+                if not next(self._steps):
+                    break
+        except StopIteration:
+            self.end_modal(context)
+            return self.finish_import()
+        except Exception as Error:
+            self.end_modal(context)
+            self._stop.set()
+            self._steps.close()
+            remove_collections(self._collections)
+            self.report({'ERROR'},"Import stopped, everything imported so far was removed: %s" % Error)
+            return {'CANCELLED'}
+        self.show_progress(context)
+        return {'RUNNING_MODAL'}
+    
+    def show_progress(self, context):
+        State = self._state
+        context.window_manager.progress_update(State["Files"])
+        context.workspace.status_text_set("Importing: %d/%d files, %d submeshes, %d vertices (ESC to cancel)" % (
+            State["Files"],len(self._files),State["Submeshes"],State["Vertices"]))
+    
+    def end_modal(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+    
+    def finish_import(self):
+        State = self._state
+        Welded = State["Welded"]
+        Instanced = State["Instanced"]
+        Failed = State["Failed"]
+        FilePaths = self._files
+        if Welded[0]:
+            self.report({'INFO'},"Welded %d vertices down to %d" % (Welded[0],Welded[1]))
+        if Instanced[0]:
+            self.report({'INFO'},"Instanced %d duplicate submeshes, %.1f MB of mesh data not built again" % (Instanced[0],Instanced[1]/(1<<20)))
+        if State["Updated"] or State["Unchanged"] or State["Removed"]:
+            self.report({'INFO'},"Updated %d submeshes in place, %d unchanged, %d no longer in their file were removed" % (
+                State["Updated"],State["Unchanged"],State["Removed"]))
+        if self.profile_import:
+            self._profile.close()
+            self.report({'INFO'},"Import profile: %s" % self._profile.summary())
+            for FilePath in self._profile.write_traces():
+                self.report({'WARNING'},"Could not write %s.trace.json" % FilePath)
+        if Failed:
+            self.report({'WARNING'},"%d of %d files failed to import" % (Failed,len(FilePaths)))
+        if Failed == len(FilePaths):
+            return {'CANCELLED'}
+                
+        return {'FINISHED'}
+
+def import_files(FilePaths,**Settings):
+    # Scripting entry point, Settings are any of the import operator's properties, e.g.
+    #   import_files(["D:/dump/chr_sonic.model"],mesh_groups="0",material_filter="*body*",import_attributes={'UV1'})
+    Folders = {} # the operator takes one directory plus file names
+    for FilePath in FilePaths:
+        Folders.setdefault(os.path.dirname(os.path.abspath(FilePath)),[]).append(os.path.basename(FilePath))
+    Results = set()
+    for Folder,Names in Folders.items():
+        Results |= bpy.ops.custom_import_scene.hedgeeng(filepath=os.path.join(Folder,Names[0]),files=[{"name":Name} for Name in Names],**Settings)
+    return Results
+
+def watch_files():
+    # bpy.app.timers callback, updates a watched file in place once its mtime changed and then held for an interval
+    for Source,Times in list(WatchedFiles.items()):
+        try:
+            Mtime = os.path.getmtime(Source)
+        except OSError: # being replaced, checked again next time
+            continue
+        if Mtime == Times[0]:
+            continue
+        if Mtime != Times[1]: # possibly still being written
+            Times[1] = Mtime
+            continue
+        Times[0] = Mtime
+        CurCollection = next((x for x in bpy.data.collections if x.get("he2_source") == Source and "he2_settings" in x),None)
+        if CurCollection is None: # removed from the scene
+            del WatchedFiles[Source]
+            continue
+        Settings = json.loads(CurCollection["he2_settings"])
+        Settings["import_attributes"] = set(Settings["import_attributes"])
+        try:
+            import_files([Source],update_existing=True,**Settings)
+        except Exception as Error:
+            print("Hedgehog Engine: could not update %s: %s" % (Source,Error))
+    return WatchInterval if WatchedFiles else None
+
+def stop_watching():
+    WatchedFiles.clear()
+    if bpy.app.timers.is_registered(watch_files):
+        bpy.app.timers.unregister(watch_files)
+
+def import_profile(self):
+    return getattr(self,"_profile",NullProfile)
+
+def instance_mesh(Hash):
+    # The registered mesh, unless it was deleted or replaced since
+    Instance = MeshInstances.get(Hash)
+    if Instance:
+        Mesh = bpy.data.meshes.get(Instance["Mesh"])
+        if Mesh and Mesh.get("he2_hash") == Hash:
+            return Mesh
+    return None
+
+def mesh_data_size(MeshData):
+    return sum(x.nbytes for x in MeshData.values() if isinstance(x,np.ndarray)) + sum(x.nbytes for x in MeshData["UV"] if x is not None)
+
+def import_settings(self):
+    # The operator properties that decide what gets built, kept on the collection for the file watcher
+    Settings = {Name:getattr(self,Name) for Name in ReimportSettings}
+    Settings["import_attributes"] = sorted(Settings["import_attributes"])
+    return Settings
+
+def imported_objects(Sources):
+    # Objects built from these files by earlier imports, proxies are left to the proxy operators
+    return [obj for obj in bpy.data.objects if obj.get("he2_source") in Sources and "he2_submesh" in obj and not obj.get("he2_proxy")]
+
+def tag_object(obj,Source,MeshData):
+    # What a later import updating existing objects matches them by
+    obj["he2_source"] = Source
+    obj["he2_submesh"] = MeshData.get("Submesh",-1)
+    obj["he2_hash"] = MeshData.get("Hash","")
+
+def model_collection(self,ModelData):
+    CurCollection = bpy.data.collections.new(os.path.basename(ModelData["FilePath"])) # Make Collection per lmd loaded
+    bpy.context.scene.collection.children.link(CurCollection)
+    getattr(self,"_collections",[]).append(CurCollection)
+    return CurCollection
+
+def remove_collections(Collections):
+    # Objects, their mesh/armature data and the collections themselves, for an import that was cancelled
+    for CurCollection in reversed(Collections):
+        for obj in list(CurCollection.objects):
+            remove_object(obj)
+        bpy.data.collections.remove(CurCollection)
+
+def remove_object(obj):
+    # The object and its mesh/armature data, unless something else still uses it
+    Data = obj.data
+    bpy.data.objects.remove(obj)
+    if isinstance(Data,bpy.types.Mesh) and Data.users == 0:
+        bpy.data.meshes.remove(Data)
+    elif isinstance(Data,bpy.types.Armature) and Data.users == 0:
+        bpy.data.armatures.remove(Data)
+
+def model_armature(self,ModelData,Armatures,CurCollection,Cache=None):
+    if not ModelData["SkelPath"]:
+        return False
+    SkelKey = skeleton_key(ModelData["SkelPath"])
+    if SkelKey not in Armatures:
+        SkelData = read_skeleton_file(ModelData["SkelPath"],self.parse_options(),Cache,import_profile(self))
+        with import_profile(self).stage("armature"):
+            Armatures[SkelKey] = build_armature(self,SkelData,CurCollection)
+    return Armatures[SkelKey]
+
+def build_model_steps(self,ModelData,Armatures,Cache=None):
+    # One submesh per step, so imports can give the UI a turn in between. Yields what happened to it
+    # ("Built", "Updated" or "Unchanged") and the decoded size it saved by being instanced, None otherwise.
+    # Then one ("Removed", None) per submesh of an earlier import that is past the end of the file now
+    Source = os.path.realpath(ModelData["FilePath"])
+    Existing = {} # submesh -> objects an earlier import of this file built
+    if self.update_existing:
+        for obj in imported_objects({Source}):
+            Existing.setdefault(obj["he2_submesh"],[]).append(obj)
+    
+    with import_profile(self).stage("build"):
+        First = next(iter(Existing.values()),[None])[0]
+        if First and First.users_collection:
+            CurCollection = First.users_collection[0]
+        else:
+            CurCollection = model_collection(self,ModelData)
+            CurCollection["he2_source"] = Source
+            CurCollection["he2_settings"] = json.dumps(import_settings(self),sort_keys=True)
+        if First and First.parent and First.parent.type == 'ARMATURE':
+            ObjArm = First.parent
+        else:
+            ObjArm = model_armature(self,ModelData,Armatures,CurCollection,Cache)
+    
+    for Submesh,MeshData in enumerate(ModelData.get("MeshStream",ModelData["Meshes"])):
+        Objects = Existing.get(MeshData.get("Submesh",-1),[])
+        Hash = MeshData.get("Hash")
+        Changed = [obj for obj in Objects if not Hash or obj.get("he2_hash") != Hash]
+        with import_profile(self).stage("build",Submesh):
+            if not Objects:
+                Action,Saved = "Built",build_mesh_object(self,MeshData,ModelData["BoneRef"],CurCollection,ObjArm,Submesh,Source)
+            elif Changed:
+                Unchanged = [obj for obj in Objects if obj not in Changed]
+                Action,Saved = "Updated",update_mesh_objects(self,Changed,MeshData,ModelData["BoneRef"],Submesh,Unchanged[0] if Unchanged else None)
+            else:
+                Action,Saved = "Unchanged",None
+        yield Action,Saved
+    
+    # Submeshes the selection left out are kept, only those the file no longer has go
+    SubmeshCount = ModelData.get("SubmeshCount")
+    for Submesh,Objects in Existing.items():
+        if SubmeshCount is not None and Submesh >= SubmeshCount:
+            for obj in Objects:
+                remove_object(obj)
+            yield "Removed",None
+
+def build_proxy_model(self,ModelData,Armatures,Cache=None):
+    # One bounds-drawn box per submesh, tagged with everything needed to decode it later
+    CurCollection = model_collection(self,ModelData)
+    ObjArm = model_armature(self,ModelData,Armatures,CurCollection,Cache)
+    Options = json.dumps(self.parse_options(),sort_keys=True)
+    for Proxy in ModelData["Proxies"]:
+        obj = bpy.data.objects.new(Proxy["MaterialName"],proxy_mesh(Proxy["BoundsMin"],Proxy["BoundsMax"]))
+        CurCollection.objects.link(obj)
+        obj.display_type = 'BOUNDS'
+        obj["he2_source"] = os.path.realpath(ModelData["FilePath"])
+        obj["he2_submesh"] = Proxy["Submesh"]
+        obj["he2_mesh_header"] = Proxy["MeshHeader"]
+        obj["he2_options"] = Options
+        obj["he2_bounds"] = Proxy["BoundsMin"]+Proxy["BoundsMax"]
+        obj["he2_proxy"] = True
+        attach_armature(obj,ObjArm)
+
+def proxy_mesh(BoundsMin,BoundsMax):
+    Corners = [(x,y,z) for x in (BoundsMin[0],BoundsMax[0]) for y in (BoundsMin[1],BoundsMax[1]) for z in (BoundsMin[2],BoundsMax[2])]
+    Faces = [(0,1,3,2),(4,6,7,5),(0,4,5,1),(2,3,7,6),(0,2,6,4),(1,5,7,3)]
+    mesh = bpy.data.meshes.new("Proxy")
+    mesh.from_pydata(Corners,[],Faces)
+    return mesh
+
+def load_proxy(obj,MeshData,BoneRef):
+    # Same object, full mesh data swapped in, so transforms and parenting done on the proxy are kept
+    Proxy = obj.data
+    mesh1 = bpy.data.meshes.new("Mesh")
+    build_mesh(mesh1,MeshData,MeshData["Faces"])
+    mesh1.materials.append(get_material(MeshData["MaterialName"]))
+    obj.data = mesh1
+    ObjArm = obj.parent if obj.parent and obj.parent.type == 'ARMATURE' else None
+    if MeshData["WBone"] is not None and ObjArm:
+        assign_weights(obj,MeshData,BoneRef)
+    obj.display_type = 'TEXTURED'
+    obj["he2_proxy"] = False
+    if Proxy.users == 0:
+        bpy.data.meshes.remove(Proxy)
+
+def unload_proxy(obj):
+    Full = obj.data
+    obj.vertex_groups.clear()
+    obj.data = proxy_mesh(obj["he2_bounds"][:3],obj["he2_bounds"][3:])
+    obj.display_type = 'BOUNDS'
+    obj["he2_proxy"] = True
+    if Full.users == 0:
+        bpy.data.meshes.remove(Full)
+
+def get_material(MaterialName):
+    MeshMat = bpy.data.materials.get(MaterialName)
+    if not MeshMat:
+        MeshMat = bpy.data.materials.new(MaterialName)
+    return MeshMat
+
+def attach_armature(obj,ObjArm):
+    if ObjArm:     
+        ArmMod = obj.modifiers.new("Armature","ARMATURE")
+        ArmMod.object = ObjArm
+        obj.parent = ObjArm
+        ObjArm.rotation_euler = (1.5707963705062866,0,0)
+    else:
+        obj.rotation_euler = (1.5707963705062866,0,0)
+
+def build_mesh_object(self,MeshData,BoneRef,CurCollection,ObjArm,Submesh=None,Source=None):
+    MaterialName = MeshData["MaterialName"]
+    
+    Hash = MeshData.get("Hash")
+    Instance = instance_mesh(Hash) if Hash and self.parse_options()["instance_duplicates"] else None
+    if MeshData.get("Instance") and not Instance:
+        raise RuntimeError("mesh data for instanced submesh %s is gone" % MaterialName)
+    
+    #buildMesh
+    mesh1 = Instance or bpy.data.meshes.new("Mesh")
+    # mesh1.use_auto_smooth = True
+    obj = bpy.data.objects.new(MaterialName,mesh1)
+    CurCollection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    if Instance:
+        link_vertex_groups(obj,MeshInstances[Hash]["Groups"])
+    else:
+        fill_mesh(self,obj,MeshData,BoneRef,ObjArm,Submesh)
+    
+    attach_armature(obj,ObjArm)
+    if Source:
+        tag_object(obj,Source,MeshData)
+    return MeshInstances[Hash]["Bytes"] if Instance else None
+
+def link_vertex_groups(obj,Names):
+    # Weights live in the mesh, an object linking it needs the same vertex groups in the same order.
+    # From Blender 3.0 the group names are stored on the mesh too, so the object already has them
+    if bpy.app.version < (3,0,0):
+        for Name in Names:
+            obj.vertex_groups.new(name=Name)
+
+def update_mesh_objects(self,Objects,MeshData,BoneRef,Submesh=None,Template=None):
+    # New data for objects an earlier import of the same file built. The objects stay, with their
+    # transforms, parenting and modifiers, only their mesh is rebuilt, in place unless something else uses it
+    Hash = MeshData.get("Hash")
+    Instance,Groups,Saved = None,None,None
+    if Hash and self.parse_options()["instance_duplicates"] and instance_mesh(Hash):
+        Instance,Groups,Saved = instance_mesh(Hash),MeshInstances[Hash]["Groups"],MeshInstances[Hash]["Bytes"]
+    elif MeshData.get("Instance"): # unchanged, but only Template still has this content
+        if not Template:
+            raise RuntimeError("mesh data for unchanged submesh %s is gone" % MeshData["MaterialName"])
+        Instance,Groups = Template.data,[x.name for x in Template.vertex_groups]
+    
+    Shared = {} # old mesh -> the objects using it
+    for obj in Objects:
+        Shared.setdefault(obj.data.name,[]).append(obj)
+    for Users in Shared.values():
+        OldMesh = Users[0].data
+        if Instance:
+            mesh1 = Instance
+        elif OldMesh.users > len(Users): # other objects keep the old data, and from 3.0 its vertex groups
+            mesh1 = bpy.data.meshes.new("Mesh")
+        else:
+            mesh1 = OldMesh
+            Users[0].vertex_groups.clear()
+            mesh1.clear_geometry()
+            mesh1.materials.clear()
+            if "he2_hash" in mesh1: # no longer the registered content
+                del mesh1["he2_hash"]
+        if bpy.app.version < (3,0,0): # vertex groups still belong to the object
+            for obj in Users:
+                obj.vertex_groups.clear()
+        for obj in Users:
+            obj.data = mesh1
+        
+        Rest,Names = Users,Groups
+        if not Instance:
+            ObjArm = Users[0].parent if Users[0].parent and Users[0].parent.type == 'ARMATURE' else None
+            fill_mesh(self,Users[0],MeshData,BoneRef,ObjArm,Submesh)
+            Rest,Names = Users[1:],[x.name for x in Users[0].vertex_groups]
+        for obj in Rest:
+            link_vertex_groups(obj,Names)
+        for obj in Users:
+            obj.name = MeshData["MaterialName"] # a submesh inserted before it moved another one to this index
+            obj["he2_hash"] = Hash or ""
+        if OldMesh.users == 0:
+            bpy.data.meshes.remove(OldMesh)
+    return Saved
+
+def fill_mesh(self,obj,MeshData,BoneRef,ObjArm,Submesh=None):
+    # Geometry, materials and weights into the empty mesh of obj
+    Profile = import_profile(self)
+    mesh1 = obj.data
+    build_mesh(mesh1,MeshData,MeshData["Faces"],Profile,Submesh)
+    
+    if "MaterialIndex" in MeshData: # merged submeshes
+        for Name in MeshData["MaterialNames"]:
+            mesh1.materials.append(get_material(Name))
+        mesh1.polygons.foreach_set("material_index",MeshData["MaterialIndex"])
+    elif len(obj.data.materials)>0:
+        obj.data.materials[0]=get_material(MeshData["MaterialName"])
+    else:
+        obj.data.materials.append(get_material(MeshData["MaterialName"]))
+    
+    if MeshData["WBone"] is not None and ObjArm:
+        with Profile.stage("weights",Submesh):
+            assign_weights(obj,MeshData,BoneRef)
+    
+    Hash = MeshData.get("Hash")
+    if Hash and self.parse_options()["instance_duplicates"] and (ObjArm or MeshData["WBone"] is None): # weights skipped without an armature, not a full copy
+        mesh1["he2_hash"] = Hash
+        MeshInstances[Hash] = {"Mesh":mesh1.name,"Groups":[x.name for x in obj.vertex_groups],"Bytes":mesh_data_size(MeshData)}
+
+def build_mesh(mesh,VertArrays,FaceArray,Profile=NullProfile,Submesh=None):
+    # Fill the mesh straight from the decoded arrays, every loop of a triangle reads its vertex's attributes
+    VertCount = len(VertArrays["Pos"])
+    FaceCount = len(FaceArray)
+    LoopVerts = FaceArray.ravel()
+    LoopSource = VertArrays.get("LoopSource",LoopVerts) # original vertex of every loop when welded
+    with Profile.stage("geometry",Submesh):
+        mesh.vertices.add(VertCount)
+        mesh.vertices.foreach_set("co",VertArrays["Pos"].ravel())
+        mesh.loops.add(len(LoopVerts))
+        mesh.loops.foreach_set("vertex_index",LoopVerts)
+        mesh.polygons.add(FaceCount)
+        mesh.polygons.foreach_set("loop_start",np.arange(0,len(LoopVerts),3,dtype=np.int32))
+        if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:
+            mesh.polygons.foreach_set("loop_total",np.full(FaceCount,3,dtype=np.int32))
+        mesh.polygons.foreach_set("use_smooth",np.ones(FaceCount,dtype=bool))
+        mesh.update(calc_edges=True)
+    
+    with Profile.stage("uv",Submesh):
+        for x,UV in enumerate(VertArrays["UV"]):
+            if UV is None:
+                continue
+            uv_layer = mesh.uv_layers.new(name="UVMap" if x == 0 else "UVMap%d" % (x+1))
+            uv_layer.data.foreach_set("uv",UV[LoopSource].ravel())
+    
+    if VertArrays["Color"] is not None:
+        with Profile.stage("color",Submesh):
+            LoopColors = VertArrays["Color"][LoopSource].ravel()
+            ByteColor = getattr(bpy.types,"ByteColorAttributeValue",None)
+            if ByteColor and "color_srgb" in ByteColor.bl_rna.properties:
+                mesh.color_attributes.new("Color",'BYTE_COLOR','CORNER').data.foreach_set("color_srgb",LoopColors)
+            else:
+                mesh.vertex_colors.new(name="Color").data.foreach_set("color",LoopColors)
+    
+    if VertArrays["Normal"] is not None:
+        with Profile.stage("normals",Submesh):
+            if "LoopSource" in VertArrays:
+                mesh.normals_split_custom_set(VertArrays["Normal"][LoopSource])
+            else:
+                mesh.normals_split_custom_set_from_vertices(VertArrays["Normal"])
+
+def assign_weights(obj,MeshData,BoneRef):
+    # Resolve bone names once, then add every vertex sharing a (bone, weight) pair in one call
+    BoneNames = [BoneRef[x] for x in MeshData["BoneRefTable"].tolist()]
+    Used = MeshData["WWeight"] != 0
+    Verts = np.nonzero(Used)[0]
+    Bones = MeshData["WBone"][Used].astype(np.int64)
+    Weights = MeshData["WWeight"][Used]
+    
+    VertexGroups = {}
+    Unique,First = np.unique(Bones,return_index=True)
+    for Bone in Unique[np.argsort(First)].tolist(): # same group order as a per-vertex walk
+        Name = BoneNames[Bone]
+        if Name not in VertexGroups:
+            VertexGroups[Name] = obj.vertex_groups.get(Name) or obj.vertex_groups.new(name=Name)
+    
+    Keys = Bones*256+Weights
+    Order = np.argsort(Keys,kind='stable')
+    Keys = Keys[Order]
+    Verts = Verts[Order]
+    Starts = np.flatnonzero(np.diff(Keys,prepend=-1)).tolist()
+    for Start,End in zip(Starts,Starts[1:]+[len(Keys)]):
+        Key = int(Keys[Start])
+        VertexGroups[BoneNames[Key >> 8]].add(Verts[Start:End].tolist(),(Key & 0xFF)/255,'ADD')
+
+def build_armature(self,SkelData,CurCollection):
+    if SkelData:
+        SkelParentingCount = len(SkelData["Names"])
+        Positions = SkelData["Pos"].tolist()
+        Rotations = SkelData["Rot"].tolist()
+        
+        armature_data = bpy.data.armatures.new("Armature")
+        armature_obj = bpy.data.objects.new("Armature", armature_data)
+        CurCollection.objects.link(armature_obj)
+        bpy.context.view_layer.objects.active = armature_obj
+        utils_set_mode('EDIT')
+        
+        EditBones = []
+        for x in range(SkelParentingCount):
+            edit_bone = armature_obj.data.edit_bones.new(SkelData["Names"][x])
+            edit_bone.use_connect = False
+            edit_bone.use_inherit_rotation = True
+            if self.aligned_scale:
+                edit_bone.inherit_scale = 'ALIGNED'
+            edit_bone.use_local_location = True
+            edit_bone.head = (0,0,0)
+            if self.use_yx_orientation:
+                edit_bone.tail = (0.1,0,0)
+                edit_bone.roll = -1.5707963705062866
+            else:
+                edit_bone.tail = (0,0.1,0)
+            EditBones.append(edit_bone)
+        
+        # Rest matrices are composed directly: a bone's local position/rotation applied on top of its parent's,
+        # roots start from the orientation every bone was created with (what pose + armature_apply used to give)
+        Parents,Order,Children,SubtreeSize = bone_hierarchy(SkelData["Parents"])
+        RestBasis = EditBones[0].matrix.copy() if EditBones else mathutils.Matrix()
+        RestMatrices = [None]*SkelParentingCount
+        for x in Order:
+            Local = mathutils.Matrix.Translation(Positions[x]) @ mathutils.Quaternion(Rotations[x]).normalized().to_matrix().to_4x4()
+            if Parents[x] > -1:
+                RestMatrices[x] = RestMatrices[Parents[x]] @ Local
+                EditBones[x].parent = EditBones[Parents[x]]
+            else:
+                RestMatrices[x] = RestBasis @ Local
+            EditBones[x].matrix = RestMatrices[x]
+        
+        if self.get_bone_lengths:
+            Lengths = [0.0]*SkelParentingCount
+            for x in Order: # parents first, so "Parent Length" is already known
+                if Children[x]:
+                    child_bone = max(Children[x],key=lambda c: SubtreeSize[c]) # child with the most children, first one on ties
+                    Len = (RestMatrices[x].translation - RestMatrices[child_bone].translation).length
+                elif self.get_bone_lengths_end == "prevLength" and Parents[x] > -1:
+                    Len = Lengths[Parents[x]]
+                elif self.get_bone_lengths_end == "customLength":
+                    Len = self.get_bone_lengths_custom
+                else:
+                    Len = self.get_bone_lengths_min
+                
+                Lengths[x] = min(max(Len,self.get_bone_lengths_min),self.get_bone_lengths_max)
+                EditBones[x].length = Lengths[x]
+                
+        utils_set_mode('OBJECT')
+        
+        return armature_obj
+    else:
+        return False
+
+def bone_hierarchy(Parents):
+    # Parent-before-child order, child lists and subtree sizes in linear time
+    Parents = [Parent if -1 < Parent < len(Parents) else -1 for Parent in Parents]
+    Children = [[] for x in Parents]
+    Roots = []
+    for x,Parent in enumerate(Parents):
+        if Parent > -1:
+            Children[Parent].append(x)
+        else:
+            Roots.append(x)
+    Order = Roots
+    for x in Order: # grows while it is walked
+        Order.extend(Children[x])
+    SubtreeSize = [1]*len(Parents)
+    for x in reversed(Order):
+        if Parents[x] > -1:
+            SubtreeSize[Parents[x]] += SubtreeSize[x]
+    return Parents,Order,Children,SubtreeSize
+
+def utils_set_mode(mode):
+    if bpy.ops.object.mode_set.poll():
+        bpy.ops.object.mode_set(mode=mode, toggle=False)
+
+def worker_executable():
+    if bpy.app.version < (2, 91, 0):
+        return bpy.app.binary_path_python # sys.executable is Blender itself before 2.91
+    return None
+
+class HedgeEngineLoadProxies(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_load_proxies"
+    bl_label = "Load Hedgehog Engine Proxies"
+    bl_description = "Decode and build the full meshes of the selected proxies"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return any(obj.get("he2_proxy") for obj in context.selected_objects)
+    
+    def execute(self, context):
+        Groups = {} # one read per source file and settings
+        for obj in context.selected_objects:
+            if obj.get("he2_proxy"):
+                Groups.setdefault((obj["he2_source"],obj["he2_options"]),[]).append(obj)
+        
+        Loaded = 0
+        for (FilePath,Options),Objects in Groups.items():
+            try:
+                BoneRef,Meshes = read_model_submeshes(FilePath,json.loads(Options),[(obj["he2_submesh"],obj["he2_mesh_header"]) for obj in Objects])
+                for obj in Objects:
+                    load_proxy(obj,Meshes[obj["he2_submesh"]],BoneRef)
+                    Loaded += 1
+            except HedgeFormatError as Error:
+                self.report({'ERROR'},str(Error))
+            except Exception as Error:
+                self.report({'ERROR'},"%s: %s" % (os.path.basename(FilePath),Error))
+        if not Loaded:
+            return {'CANCELLED'}
+        self.report({'INFO'},"Loaded %d proxies" % Loaded)
+        return {'FINISHED'}
+
+class HedgeEngineUnloadProxies(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_unload_proxies"
+    bl_label = "Unload Hedgehog Engine Proxies"
+    bl_description = "Turn the selected loaded proxies back into boxes and free their mesh data"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return any("he2_proxy" in obj and not obj["he2_proxy"] for obj in context.selected_objects)
+    
+    def execute(self, context):
+        Unloaded = 0
+        for obj in context.selected_objects:
+            if "he2_proxy" in obj and not obj["he2_proxy"]:
+                unload_proxy(obj)
+                Unloaded += 1
+        self.report({'INFO'},"Unloaded %d proxies" % Unloaded)
+        return {'FINISHED'}
+
+class HedgeEngineWatch(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_watch"
+    bl_label = "Watch Imported Files"
+    bl_description = "Update imported models in place whenever their .model files change on disk, run again to stop"
+    
+    def execute(self, context):
+        if bpy.app.timers.is_registered(watch_files):
+            stop_watching()
+            self.report({'INFO'},"Stopped watching imported files")
+            return {'FINISHED'}
+        WatchedFiles.clear()
+        for CurCollection in bpy.data.collections:
+            Source = CurCollection.get("he2_source")
+            if Source and "he2_settings" in CurCollection and os.path.isfile(Source):
+                Mtime = os.path.getmtime(Source)
+                WatchedFiles[Source] = [Mtime,Mtime]
+        if not WatchedFiles:
+            self.report({'WARNING'},"No imported models to watch")
+            return {'CANCELLED'}
+        bpy.app.timers.register(watch_files,first_interval=WatchInterval)
+        self.report({'INFO'},"Watching %d files" % len(WatchedFiles))
+        return {'FINISHED'}
+
+def catalog_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES',path="hedgehog_engine_catalog",create=True),"catalog.sqlite")
+
+class HedgeEngineCatalogResult(bpy.types.PropertyGroup):
+    path: StringProperty(subtype='FILE_PATH')
+    label: StringProperty()
+    select: BoolProperty(name="Select", default=False)
+
+class HedgeEngineCatalogSettings(bpy.types.PropertyGroup):
+    root: StringProperty(
+            name="Game Directory",
+            description="Directory searched recursively for models",
+            subtype='DIR_PATH',
+            )
+    name: StringProperty(name="File", description="Part of the file path, or a pattern with * and ?")
+    material: StringProperty(name="Material", description="Material name used by any submesh, or a pattern with * and ?")
+    bone: StringProperty(name="Bone", description="Bone name referenced by the model, or a pattern with * and ?")
+    min_verts: IntProperty(name="Min Vertices", description="0 means no limit", default=0, min=0)
+    max_verts: IntProperty(name="Max Vertices", description="0 means no limit", default=0, min=0)
+    results: CollectionProperty(type=HedgeEngineCatalogResult)
+    result_index: IntProperty()
+
+class HedgeEngineCatalogScan(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_catalog_scan"
+    bl_label = "Scan"
+    bl_description = "Index the headers of every model in the game directory, files unchanged since the last scan are skipped"
+    
+    def execute(self, context):
+        Settings = context.window_manager.hedge_catalog
+        Root = bpy.path.abspath(Settings.root)
+        if not os.path.isdir(Root):
+            self.report({'ERROR'},"Not a directory: %s" % Root)
+            return {'CANCELLED'}
+        Counts = he2_catalog.scan(catalog_path(),Root)
+        self.report({'INFO'},"Catalog: %(added)d added, %(updated)d updated, %(removed)d removed, %(unchanged)d unchanged, %(failed)d unreadable" % Counts)
+        return {'FINISHED'}
+
+class HedgeEngineCatalogSearch(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_catalog_search"
+    bl_label = "Search"
+    bl_description = "List the catalogued models matching every filter"
+    
+    def execute(self, context):
+        Settings = context.window_manager.hedge_catalog
+        Settings.results.clear()
+        Root = bpy.path.abspath(Settings.root)
+        for Row in he2_catalog.query(catalog_path(),Settings.name,Settings.material,Settings.bone,Settings.min_verts,Settings.max_verts):
+            Item = Settings.results.add()
+            Item.path = Row["path"]
+            Name = os.path.relpath(Row["path"],Root) if Root and Row["path"].startswith(os.path.realpath(Root)) else Row["path"]
+            Item.label = "%s  (%d verts, %d meshes, %d bones)" % (Name,Row["vert_count"],Row["mesh_count"],Row["bone_count"])
+        self.report({'INFO'},"%d models found" % len(Settings.results))
+        return {'FINISHED'}
+
+class HedgeEngineCatalogImport(bpy.types.Operator):
+    bl_idname = "custom_import_scene.hedgeeng_catalog_import"
+    bl_label = "Import Results"
+    bl_description = "Import the ticked results, or the highlighted one when none is ticked"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return len(context.window_manager.hedge_catalog.results) > 0
+    
+    def execute(self, context):
+        Settings = context.window_manager.hedge_catalog
+        Paths = [Item.path for Item in Settings.results if Item.select]
+        if not Paths and 0 <= Settings.result_index < len(Settings.results):
+            Paths = [Settings.results[Settings.result_index].path]
+        import_files(Paths)
+        return {'FINISHED'}
+
+class HEDGE_UL_catalog_results(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.prop(item, "select", text="")
+        layout.label(text=item.label)
+
+class HedgeEngineCatalogPanel(bpy.types.Panel):
+    bl_idname = "VIEW3D_PT_hedge_catalog"
+    bl_label = "Hedgehog Engine Catalog"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Hedgehog"
+    
+    def draw(self, context):
+        layout = self.layout
+        Settings = context.window_manager.hedge_catalog
+        uiScanRow = layout.row(align=True)
+        uiScanRow.prop(Settings, "root", text="")
+        uiScanRow.operator(HedgeEngineCatalogScan.bl_idname, icon="FILE_REFRESH")
+        
+        uiFilterBox = layout.box()
+        uiFilterBox.prop(Settings, "name")
+        uiFilterBox.prop(Settings, "material")
+        uiFilterBox.prop(Settings, "bone")
+        uiVertRow = uiFilterBox.row()
+        uiVertRow.prop(Settings, "min_verts")
+        uiVertRow.prop(Settings, "max_verts")
+        uiFilterBox.operator(HedgeEngineCatalogSearch.bl_idname, icon="VIEWZOOM")
+        
+        layout.template_list("HEDGE_UL_catalog_results", "", Settings, "results", Settings, "result_index")
+        layout.operator(HedgeEngineCatalogImport.bl_idname, icon="IMPORT")
+        
+        if bpy.app.timers.is_registered(watch_files):
+            layout.operator(HedgeEngineWatch.bl_idname, text="Stop Watching (%d files)" % len(WatchedFiles), icon="PAUSE")
+        else:
+            layout.operator(HedgeEngineWatch.bl_idname, icon="FILE_REFRESH")
+
+classes = (
+    HedgeEngineTest,
+    HedgeEngineLoadProxies,
+    HedgeEngineUnloadProxies,
+    HedgeEngineWatch,
+    HedgeEngineCatalogResult,
+    HedgeEngineCatalogSettings,
+    HedgeEngineCatalogScan,
+    HedgeEngineCatalogSearch,
+    HedgeEngineCatalogImport,
+    HEDGE_UL_catalog_results,
+    HedgeEngineCatalogPanel,
+)
+
+def menu_func_import(self, context):
+    self.layout.operator(HedgeEngineTest.bl_idname, text="Hedgehog Engine (.model)")
+
+def menu_func_proxies(self, context):
+    self.layout.operator(HedgeEngineLoadProxies.bl_idname)
+    self.layout.operator(HedgeEngineUnloadProxies.bl_idname)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.WindowManager.hedge_catalog = PointerProperty(type=HedgeEngineCatalogSettings)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+    bpy.types.VIEW3D_MT_object.append(menu_func_proxies)
+
+def unregister():
+    stop_watching()
+    bpy.types.VIEW3D_MT_object.remove(menu_func_proxies)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
+    del bpy.types.WindowManager.hedge_catalog
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
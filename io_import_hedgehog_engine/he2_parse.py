@@ -0,0 +1,673 @@
+import os
+import struct
+import fnmatch
+import hashlib
+import mmap
+import queue
+import threading
+import multiprocessing
+import concurrent.futures
+import numpy as np
+from . import he2_cache
+from .he2_profile import NullProfile
+
+UVElements = (0x50000,0x50100,0x50200,0x50300)
+WeightElements = ((0x20000,0x10000),(0x20100,0x10100))
+ModelExtensions = (".model",".terrain-model")
+VertexAttributes = {"UV1":(0x50000,),"UV2":(0x50100,),"UV3":(0x50200,),"UV4":(0x50300,),
+                    "NORMAL":(0x30000,),"COLOR":(0xA0000,),"WEIGHTS":(0x20000,0x10000,0x20100,0x10100)}
+ModelInfoStruct = struct.Struct('>7I')
+MeshGroupStruct = struct.Struct('>4I')
+MeshHeaderStruct = struct.Struct('>9I')
+VertElementStruct = struct.Struct('>IiI')
+SkelTransformDtype = np.dtype({"names":["Pos","Rot"],"formats":[('<f4',3),('<f4',4)],"offsets":[0,0x10],"itemsize":0x30})
+
+class HedgeFormatError(Exception):
+    pass
+
+class HedgeReader:
+    # Read-only memory map of a whole file, every offset is absolute and checked against the file size
+    def __init__(self,FilePath,Endian):
+        self.FilePath = FilePath
+        with open(FilePath,"rb") as f:
+            self.Size = os.fstat(f.fileno()).st_size
+            if self.Size == 0:
+                raise HedgeFormatError("%s is empty" % os.path.basename(FilePath))
+            self.Map = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        self.View = memoryview(self.Map)
+        self.U16 = struct.Struct(Endian+'H')
+        self.U32 = struct.Struct(Endian+'I')
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,*args):
+        self.close()
+        
+    def close(self):
+        self.View.release()
+        try:
+            self.Map.close()
+        except BufferError:
+            pass # arrays still wrapping the map keep it open until they are collected
+    
+    def check(self,Offset,Size):
+        if Offset < 0 or Offset+Size > self.Size:
+            raise HedgeFormatError("%s: 0x%X bytes at 0x%X are outside the file (0x%X bytes)" % (os.path.basename(self.FilePath),Size,Offset,self.Size))
+    
+    def unpack(self,Struct,Offset):
+        self.check(Offset,Struct.size)
+        return Struct.unpack_from(self.Map,Offset)
+    
+    def u16(self,Offset):
+        return self.unpack(self.U16,Offset)[0]
+    
+    def u32(self,Offset):
+        return self.unpack(self.U32,Offset)[0]
+    
+    def string(self,Offset):
+        self.check(Offset,1)
+        End = self.Map.find(b'\0',Offset)
+        if End == -1:
+            raise HedgeFormatError("%s: string at 0x%X is not terminated" % (os.path.basename(self.FilePath),Offset))
+        return str(self.View[Offset:End],'utf-8')
+    
+    def view(self,Offset,Size):
+        self.check(Offset,Size)
+        return self.View[Offset:Offset+Size]
+    
+    def array(self,Offset,Dtype,Count):
+        Dtype = np.dtype(Dtype)
+        self.check(Offset,Dtype.itemsize*Count)
+        return np.frombuffer(self.Map,dtype=Dtype,count=Count,offset=Offset)
+
+def skeleton_path(FilePath):
+    return os.path.splitext(FilePath)[0]+".skl.pxd"
+
+def find_models(Root):
+    # Every model below Root, in the same order on every run
+    for Folder,Dirs,Files in os.walk(Root):
+        Dirs.sort()
+        for Name in sorted(Files):
+            if Name.endswith(ModelExtensions):
+                yield os.path.join(Folder,Name)
+
+def skeleton_key(SkelPath):
+    # Models sharing one .skl.pxd share one armature, an edited skeleton counts as a new one
+    return os.path.realpath(SkelPath),os.path.getmtime(SkelPath)
+
+def read_model_file(FilePath,Options,Profile=NullProfile,KnownHashes=frozenset(),Threads=1):
+    # Everything the importer needs from one .model, as plain lists and arrays
+    with Profile.stage("parse"):
+        ModelData = read_model_stream(FilePath,Options,Profile,KnownHashes,Threads)
+        for MeshData in ModelData.pop("MeshStream"):
+            pass
+    
+    if Options.get("merge_submeshes") and ModelData["Meshes"]:
+        with Profile.stage("merge"):
+            Name = os.path.basename(FilePath).split(".")[0]
+            Hashes = [MeshData.get("Hash") for MeshData in ModelData["Meshes"]]
+            ModelData["Meshes"] = [merge_meshes(ModelData["Meshes"],len(ModelData["BoneRef"]),Name)]
+            if all(Hashes):
+                ModelData["Meshes"][0]["Hash"] = hashlib.sha1("\0".join(Hashes).encode('utf-8')).hexdigest()
+        with Profile.stage("weld"):
+            weld_meshes(ModelData["Meshes"],Options)
+    return ModelData
+
+def read_model_stream(FilePath,Options,Profile=NullProfile,KnownHashes=frozenset(),Threads=1):
+    # read_model_file up to the submesh headers. ModelData["MeshStream"] yields the decoded submeshes in order
+    # while Threads threads (0 is one per core) decode the ones after, each is also appended to ModelData["Meshes"].
+    # The file stays open until the stream is exhausted or closed
+    ModelData = {"FilePath":FilePath,"SkelPath":None,"BoneRef":[],"Meshes":[]}
+    if os.path.exists(skeleton_path(FilePath)):
+        ModelData["SkelPath"] = skeleton_path(FilePath)
+    
+    Model = HedgeReader(FilePath,'>')
+    try:
+        with Profile.stage("header"):
+            ModelInfo = read_model_info(Model)
+            ModelData["BoneRef"] = read_boneref_names(Model,ModelInfo["BoneCount"],ModelInfo["BoneNameOffset"])
+        ModelData["SubmeshCount"] = len(ModelInfo["MeshHeaders"]) # in the file, not only the selected ones
+        Hashing = Options.get("instance_duplicates") or Options.get("update_existing")
+        Source = os.path.realpath(FilePath)
+        Jobs = [] # (Submesh, Header, Hash, Known)
+        for Submesh,MeshHeader in selected_submeshes(Model,ModelInfo,Options):
+            with Profile.stage("mesh_header",Submesh):
+                Header = read_mesh_header(Model,MeshHeader)
+            Hash = None
+            if Hashing:
+                with Profile.stage("hash",Submesh):
+                    Hash = mesh_hash(Model,Header,ModelData["BoneRef"],ModelInfo["BoneRefSize"],
+                                     (Options["import_strips"],Options.get("weld_vertices"),Options.get("attributes")))
+            # already built in this session or unchanged since this file was last imported, the importer reuses that mesh
+            Known = Hash is not None and (Hash in KnownHashes or (Source,Submesh,Hash) in KnownHashes)
+            Jobs.append((Submesh,Header,Hash,Known))
+    except Exception:
+        Model.close()
+        raise
+    ModelData["MeshStream"] = decode_submeshes(Model,ModelInfo["BoneRefSize"],Jobs,Options,Profile,Threads,ModelData["Meshes"])
+    return ModelData
+
+def decode_submeshes(Model,BoneRefSize,Jobs,Options,Profile,Threads,Meshes):
+    # Generator behind ModelData["MeshStream"], closes Model when done.
+    # Decoding is mostly numpy copies and conversions that release the GIL, so threads share one map
+    Welding = Options.get("weld_vertices","NONE") != "NONE" and not Options.get("merge_submeshes") # merged meshes are welded after merging
+    def decode(Job):
+        Submesh,Header,Hash,Known = Job
+        if Known:
+            MeshData = {"MaterialName":Header["MaterialName"],"Instance":True}
+        else:
+            MeshData = decode_mesh(Model,Header,BoneRefSize,Options["import_strips"],Profile,Submesh,Options.get("attributes"))
+            if Welding:
+                with Profile.stage("weld",Submesh):
+                    weld_meshes([MeshData],Options)
+        if Hash is not None:
+            MeshData["Hash"] = Hash
+        MeshData["Submesh"] = Submesh
+        return MeshData
+    
+    if getattr(Profile,"Memory",False): # tracemalloc peaks are per process, stages on other threads would mix them up
+        Threads = 1
+    Pool = None
+    try:
+        if Threads == 1 or len(Jobs) < 2:
+            Results = map(decode,Jobs)
+        else:
+            Pool = concurrent.futures.ThreadPoolExecutor(max_workers=Threads or os.cpu_count())
+            Results = Pool.map(decode,Jobs)
+        for MeshData in Results:
+            Meshes.append(MeshData)
+            yield MeshData
+    finally:
+        if Pool:
+            Results.close() # cancels the submeshes not started yet
+            Pool.shutdown()
+        Model.close()
+
+def read_model_proxies(FilePath,Options):
+    # Header tables and a bounding box per submesh, enough to place stand-ins without decoding anything
+    ModelData = {"FilePath":FilePath,"SkelPath":None,"Proxies":[]}
+    if os.path.exists(skeleton_path(FilePath)):
+        ModelData["SkelPath"] = skeleton_path(FilePath)
+    
+    with HedgeReader(FilePath,'>') as Model:
+        ModelInfo = read_model_info(Model)
+        for Submesh,MeshHeader in selected_submeshes(Model,ModelInfo,Options):
+            Header = read_mesh_header(Model,MeshHeader)
+            BoundsMin,BoundsMax = mesh_bounds(Model,Header)
+            ModelData["Proxies"].append({"Submesh":Submesh,"MeshHeader":MeshHeader,"MaterialName":Header["MaterialName"],
+                                         "VertCount":Header["VertCount"],"IndiceCount":Header["IndiceCount"],
+                                         "BoundsMin":BoundsMin,"BoundsMax":BoundsMax})
+    return ModelData
+
+def read_model_submeshes(FilePath,Options,Submeshes):
+    # Decodes only the given (submesh index, header offset) pairs, the offsets recorded on proxies must still match
+    with HedgeReader(FilePath,'>') as Model:
+        ModelInfo = read_model_info(Model)
+        BoneRef = read_boneref_names(Model,ModelInfo["BoneCount"],ModelInfo["BoneNameOffset"])
+        Meshes = {}
+        for Submesh,MeshHeader in Submeshes:
+            if Submesh >= len(ModelInfo["MeshHeaders"]) or ModelInfo["MeshHeaders"][Submesh] != MeshHeader:
+                raise HedgeFormatError("%s: submesh %d is not where the proxy expects it, the file has changed" % (os.path.basename(FilePath),Submesh))
+            Meshes[Submesh] = read_mesh(Model,MeshHeader,ModelInfo["BoneRefSize"],Options["import_strips"],Attributes=Options.get("attributes"))
+            Meshes[Submesh]["Submesh"] = Submesh
+    weld_meshes(Meshes.values(),Options)
+    return BoneRef,Meshes
+
+def parse_proxies(FilePaths,Options):
+    # Same (FilePath, ModelData, Error) results as parse_files, header only
+    for FilePath in FilePaths:
+        try:
+            Result = FilePath,read_model_proxies(FilePath,Options),None
+        except HedgeFormatError as Error:
+            Result = FilePath,None,str(Error)
+        except Exception as Error:
+            Result = FilePath,None,"%s: %s" % (os.path.basename(FilePath),Error)
+        yield Result
+
+def parse_index_list(Text):
+    # "0,2-4" -> [0, 2, 3, 4], empty text -> None (everything). ValueError on anything else, a reversed
+    # range included, so a typo never silently imports the whole model
+    Indices = set()
+    for Part in Text.replace(" ","").split(","):
+        if not Part:
+            continue
+        First,_,Last = Part.partition("-")
+        First,Last = int(First),int(Last or First)
+        if Last < First:
+            raise ValueError("reversed range %s" % Part)
+        Indices.update(range(First,Last+1))
+    return sorted(Indices) or None
+
+def selected_submeshes(Model,ModelInfo,Options):
+    # (submesh index, header offset) of every submesh the selection options let through, in file order.
+    # Submesh indices count across all mesh groups, materials are fnmatch patterns, unset options select everything
+    MeshGroups = Options.get("mesh_groups")
+    Submeshes = Options.get("submeshes")
+    Materials = Options.get("materials")
+    Selected = []
+    for Submesh,(MeshHeader,MeshGroup) in enumerate(zip(ModelInfo["MeshHeaders"],ModelInfo["MeshGroups"])):
+        if MeshGroups and MeshGroup not in MeshGroups:
+            continue
+        if Submeshes and Submesh not in Submeshes:
+            continue
+        if Materials:
+            MaterialName = Model.string(Model.u32(MeshHeader)+0x10)
+            if not any(fnmatch.fnmatchcase(MaterialName,Pattern) for Pattern in Materials):
+                continue
+        Selected.append((Submesh,MeshHeader))
+    return Selected
+
+def select_vertex_elements(VertData,Attributes):
+    # Drops the elements of unselected attributes so they are never read, None keeps everything
+    if Attributes is None:
+        return VertData
+    Dropped = set(Element for Name,Elements in VertexAttributes.items() if Name not in Attributes for Element in Elements)
+    return {Index:Element for Index,Element in VertData.items() if Index not in Dropped}
+
+def read_model_info(Model):
+    # Header walk only, MeshHeaders lists every submesh header offset in file order and MeshGroups their group
+    tmpPointer = Model.u32(Model.u32(0x8))
+    MeshJump1Count,MeshJump1,_,_,BoneCount,BoneNameOffset,BonePosOffset = Model.unpack(ModelInfoStruct,tmpPointer+0xC)
+    MeshJump1 += 0x10
+    BoneNameOffset += 0x10
+    if BoneCount <=255:
+        BoneRefSize = 1
+    else:
+        BoneRefSize = 2
+    
+    MeshHeaders = []
+    MeshGroups = []
+    for MJ1 in range(MeshJump1Count):
+        MeshGroup = Model.u32(MeshJump1+4*MJ1)+0x10 #reads pointer to mesh count
+        MeshCount,MeshTableOffset,MaterialCount,MaterialTableOffset = Model.unpack(MeshGroupStruct,MeshGroup)
+        if MeshCount == 0:
+            MeshCount = 1
+        MeshTableOffset += 0x10
+        
+        for mc in range(MeshCount):
+            MeshHeaders.append(Model.u32(MeshTableOffset+4*mc)+0x10)
+            MeshGroups.append(MJ1)
+    return {"BoneCount":BoneCount,"BoneNameOffset":BoneNameOffset,"BoneRefSize":BoneRefSize,
+            "MeshHeaders":MeshHeaders,"MeshGroups":MeshGroups}
+
+def read_model_file_cached(FilePath,Options,Cache,Profile=NullProfile,Threads=1):
+    # Cache is (CacheDir, SizeLimit in bytes), a hit skips all parsing
+    with Profile.stage("cache_load"):
+        Key = he2_cache.cache_key([FilePath],Options)
+        ModelData = he2_cache.load_model(Cache[0],Key)
+    if ModelData is None:
+        ModelData = read_model_file(FilePath,Options,Profile,Threads=Threads)
+        with Profile.stage("cache_store"):
+            he2_cache.store_model(Cache[0],Key,ModelData,Cache[1])
+    ModelData["FilePath"] = FilePath
+    ModelData["SkelPath"] = skeleton_path(FilePath) if os.path.exists(skeleton_path(FilePath)) else None
+    return ModelData
+
+def read_skeleton_file(SkelPath,Options,Cache=None,Profile=NullProfile):
+    with Profile.stage("skeleton_parse"):
+        if not Cache:
+            return read_skeleton(SkelPath,Options["use_yx_orientation"])
+        Key = he2_cache.cache_key([SkelPath],{"use_yx_orientation":Options["use_yx_orientation"]})
+        SkelData = he2_cache.load_model(Cache[0],Key)
+        if SkelData is None:
+            SkelData = read_skeleton(SkelPath,Options["use_yx_orientation"])
+            he2_cache.store_model(Cache[0],Key,SkelData,Cache[1])
+        return SkelData
+
+def try_read_model_file(FilePath,Options,Cache=None,Profile=NullProfile,KnownHashes=frozenset(),Threads=1):
+    # Profile is this file's own, its records travel back in ModelData["Profile"]
+    # Cached entries always hold every submesh, KnownHashes only skips decoding on the uncached path
+    try:
+        if Cache:
+            ModelData = read_model_file_cached(FilePath,Options,Cache,Profile,Threads)
+        else:
+            ModelData = read_model_file(FilePath,Options,Profile,KnownHashes,Threads)
+    except HedgeFormatError as Error:
+        return None,str(Error)
+    except Exception as Error:
+        return None,"%s: %s" % (os.path.basename(FilePath),Error)
+    finally:
+        Profile.close()
+    ModelData["Profile"] = list(Profile.Records)
+    return ModelData,None
+
+def merge_profile(Result,Profile):
+    FilePath,ModelData,Error = Result
+    if ModelData is not None:
+        Profile.merge(ModelData.pop("Profile",[]))
+    return Result
+
+def parse_files(FilePaths,Options,Workers=1,Executable=None,Cache=None,Profile=NullProfile,KnownHashes=frozenset(),Threads=1):
+    # Yields (FilePath, ModelData, Error) in the given order, a failed file only sets its own Error
+    # KnownHashes may keep growing while this runs, in order every file sees what the previous ones added
+    # Threads decode the submeshes of one file, worker processes decode on one thread each
+    if Workers == 1 or len(FilePaths) < 2:
+        for FilePath in FilePaths:
+            yield merge_profile((FilePath,*try_read_model_file(FilePath,Options,Cache,Profile.fork(FilePath),KnownHashes,Threads)),Profile)
+        return
+    
+    Context = multiprocessing.get_context("spawn")
+    if Executable:
+        Context.set_executable(Executable)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=Workers or None,mp_context=Context) as Pool:
+        KnownHashes = frozenset(KnownHashes) # workers only get what was known before the batch
+        Futures = [Pool.submit(try_read_model_file,FilePath,Options,Cache,Profile.fork(FilePath),KnownHashes) for FilePath in FilePaths]
+        try:
+            for FilePath,Future in zip(FilePaths,Futures):
+                try:
+                    yield merge_profile((FilePath,*Future.result()),Profile)
+                except Exception as Error: # the worker process itself went down
+                    yield FilePath,None,"%s: %s" % (os.path.basename(FilePath),Error)
+        finally:
+            for Future in Futures: # closed early, don't wait for files nobody will build
+                Future.cancel()
+
+def stream_files(FilePaths,Options,Profile=NullProfile,KnownHashes=frozenset(),Threads=0):
+    # parse_files for building each submesh as soon as it is decoded, through ModelData["MeshStream"].
+    # Asking for the next file closes the previous stream, so consume it first. No cache or merging
+    for FilePath in FilePaths:
+        FileProfile = Profile.fork(FilePath)
+        try:
+            ModelData = read_model_stream(FilePath,Options,FileProfile,KnownHashes,Threads)
+        except HedgeFormatError as Error:
+            yield FilePath,None,str(Error)
+            continue
+        except Exception as Error:
+            yield FilePath,None,"%s: %s" % (os.path.basename(FilePath),Error)
+            continue
+        try:
+            yield FilePath,ModelData,None
+        finally:
+            ModelData["MeshStream"].close()
+            FileProfile.close()
+            Profile.merge(FileProfile.Records)
+
+def parse_in_thread(Results,Stop):
+    # Runs a parse_files/parse_proxies generator on a background thread.
+    # Yields its results in order, and None whenever the next one is not ready yet
+    Queue = queue.Queue()
+    Done = object()
+    def run():
+        try:
+            for Result in Results:
+                Queue.put(Result)
+                if Stop.is_set():
+                    break
+        finally:
+            Results.close()
+            Queue.put(Done)
+    threading.Thread(target=run,daemon=True).start()
+    while True:
+        try:
+            Result = Queue.get_nowait()
+        except queue.Empty:
+            yield None
+            continue
+        if Result is Done:
+            return
+        yield Result
+
+def read_mesh(Model,MeshHeader,BoneRefSize,UseStrips,Profile=NullProfile,Submesh=None,Attributes=None):
+    with Profile.stage("mesh_header",Submesh):
+        Header = read_mesh_header(Model,MeshHeader)
+    return decode_mesh(Model,Header,BoneRefSize,UseStrips,Profile,Submesh,Attributes)
+
+def read_mesh_header(Model,MeshHeader):
+    # Offsets come back absolute, nothing past the vertex format table is touched
+    (MaterialNamePointer,IndiceCount,IndiceOffset,VertCount,VertSize,
+     VertChunkOffset,VertDataTypeOffset,BoneRefCount,BoneRefOffset) = Model.unpack(MeshHeaderStruct,MeshHeader)
+    return {"MaterialName":Model.string(MaterialNamePointer+0x10),
+            "IndiceCount":IndiceCount,"IndiceOffset":IndiceOffset+0x10,
+            "VertCount":VertCount,"VertSize":VertSize,"VertChunkOffset":VertChunkOffset+0x10,
+            "VertData":read_vertex_format(Model,VertDataTypeOffset+0x10),
+            "BoneRefCount":BoneRefCount,"BoneRefOffset":BoneRefOffset+0x10}
+
+def mesh_hash(Model,Header,BoneRef,BoneRefSize,Settings):
+    # Content address of a submesh: raw vertex chunk, index buffer, vertex format, the bone names it
+    # references and everything else that ends up in the mesh datablock
+    Hash = hashlib.sha1()
+    Hash.update(repr((Header["MaterialName"],Header["VertCount"],Header["VertSize"],Header["IndiceCount"],
+                      sorted(Header["VertData"].items()),Settings)).encode('utf-8'))
+    Hash.update(Model.view(Header["VertChunkOffset"],Header["VertCount"]*Header["VertSize"]))
+    Hash.update(Model.view(Header["IndiceOffset"],Header["IndiceCount"]*2))
+    BoneRefTable = Model.array(Header["BoneRefOffset"],'>u%d' % BoneRefSize,Header["BoneRefCount"]).tolist()
+    Hash.update("\0".join(BoneRef[x] if x < len(BoneRef) else "" for x in BoneRefTable).encode('utf-8'))
+    return Hash.hexdigest()
+
+def mesh_bounds(Model,Header):
+    # Reads only the position of every vertex
+    if not Header["VertCount"]:
+        return [0.0]*3,[0.0]*3
+    PosDtype = np.dtype({"names":["Pos"],"formats":[('>f4',3)],"offsets":[Header["VertData"].get(0,[0])[0]],"itemsize":Header["VertSize"]})
+    Pos = Model.array(Header["VertChunkOffset"],PosDtype,Header["VertCount"])["Pos"]
+    return Pos.min(axis=0).tolist(),Pos.max(axis=0).tolist()
+
+def read_faces(Model,Header,UseStrips):
+    Indices = Model.array(Header["IndiceOffset"],'>u2',Header["IndiceCount"])
+    if UseStrips:
+        return strip2face(Indices)
+    return Indices[:len(Indices)//3*3].reshape(-1,3)[:,::-1].astype(np.int32)
+
+def decode_mesh(Model,Header,BoneRefSize,UseStrips,Profile=NullProfile,Submesh=None,Attributes=None):
+    BoneRefTable = Model.array(Header["BoneRefOffset"],'>u%d' % BoneRefSize,Header["BoneRefCount"]).astype(np.int32)
+    with Profile.stage("indices",Submesh):
+        FaceArray = read_faces(Model,Header,UseStrips)
+    
+    with Profile.stage("vertices",Submesh):
+        MeshData = decode_vertices(Model,Header["VertChunkOffset"],Header["VertCount"],Header["VertSize"],
+                                   select_vertex_elements(Header["VertData"],Attributes))
+    MeshData["MaterialName"] = Header["MaterialName"]
+    MeshData["BoneRefTable"] = BoneRefTable
+    with Profile.stage("faces",Submesh):
+        MeshData["Faces"] = filter_faces(FaceArray,Header["VertCount"])
+    return MeshData
+
+def read_vertex_format(Model,VertDataTypeOffset):
+    VertData = {}
+    VTypeOffset = 0
+    while VTypeOffset < 0xff:
+        VTypeOffset,VTypeFormat,VTypeIndex = Model.unpack(VertElementStruct,VertDataTypeOffset)
+        VertDataTypeOffset += VertElementStruct.size
+        if VTypeFormat == -1:
+            break
+        VertData[VTypeIndex] = [VTypeOffset,VTypeFormat]
+    return VertData
+
+def merge_meshes(Meshes,BoneCount,Name):
+    # All submeshes as one: faces offset past the previous vertices, one material slot per unique name,
+    # bone indices resolved through each BoneRefTable so they index the file's bone names directly.
+    # Attributes only some submeshes have are padded (zero UVs and weights, white color, zero normal = automatic)
+    Starts = np.cumsum([0]+[len(MeshData["Pos"]) for MeshData in Meshes])
+    def merged(Arrays,Fill,Dtype):
+        Present = [x for x in Arrays if x is not None]
+        if not Present:
+            return None
+        Array = np.full((Starts[-1],max(x.shape[1] for x in Present)),Fill,dtype=Dtype)
+        for Start,Part in zip(Starts,Arrays):
+            if Part is not None:
+                Array[Start:Start+len(Part),:Part.shape[1]] = Part
+        return Array
+    
+    WBones = []
+    for MeshData in Meshes:
+        if MeshData["WBone"] is None:
+            WBones.append(None)
+            continue
+        Used = MeshData["WWeight"] != 0
+        Table = MeshData["BoneRefTable"] if len(MeshData["BoneRefTable"]) else np.zeros(1,dtype=np.int32)
+        WBones.append(np.where(Used,Table[np.where(Used,MeshData["WBone"],0)],0))
+    
+    MaterialNames = list(dict.fromkeys(MeshData["MaterialName"] for MeshData in Meshes))
+    return {"MaterialName":Name,"MaterialNames":MaterialNames,
+            "Pos":np.concatenate([MeshData["Pos"] for MeshData in Meshes]),
+            "UV":[merged([MeshData["UV"][x] for MeshData in Meshes],0,np.float32) for x in range(len(UVElements))],
+            "Normal":merged([MeshData["Normal"] for MeshData in Meshes],0,np.float32),
+            "Color":merged([MeshData["Color"] for MeshData in Meshes],1,np.float32),
+            "WBone":merged(WBones,0,np.int32),
+            "WWeight":merged([MeshData["WWeight"] for MeshData in Meshes],0,np.uint8),
+            "BoneRefTable":np.arange(BoneCount,dtype=np.int32),
+            "Faces":np.concatenate([MeshData["Faces"]+Start for Start,MeshData in zip(Starts,Meshes)]).astype(np.int32),
+            "MaterialIndex":np.repeat([MaterialNames.index(MeshData["MaterialName"]) for MeshData in Meshes],
+                                      [len(MeshData["Faces"]) for MeshData in Meshes]).astype(np.int32)}
+
+def filter_faces(FaceArray,VertCount):
+    return FaceArray[kept_faces(FaceArray,VertCount)]
+
+def kept_faces(FaceArray,VertCount):
+    # Indices of the triangles bm.faces.new would accept: in range, not degenerate, not already existing
+    Valid = (FaceArray < VertCount).all(axis=1)
+    Valid &= (FaceArray[:,0] != FaceArray[:,1]) & (FaceArray[:,1] != FaceArray[:,2]) & (FaceArray[:,0] != FaceArray[:,2])
+    Valid = np.flatnonzero(Valid)
+    if len(Valid) == 0:
+        return Valid
+    _,First = np.unique(np.sort(FaceArray[Valid],axis=1),axis=0,return_index=True)
+    return Valid[np.sort(First)]
+
+def weld_meshes(Meshes,Options):
+    Mode = Options.get("weld_vertices","NONE")
+    if Mode != "NONE":
+        for MeshData in Meshes:
+            if not MeshData.get("Instance"):
+                weld_vertices(MeshData,Mode)
+
+def weld_vertices(MeshData,Mode):
+    # Vertices with identical position ("POSITION") or identical everything ("ATTRIBUTES") become one.
+    # UVs, colors and normals stay per original vertex and are read per loop through LoopSource,
+    # faces that collapse or turn into duplicates are dropped like filter_faces does
+    Pos = MeshData["Pos"]
+    if len(Pos) == 0:
+        return MeshData
+    Keys = [Pos]
+    if Mode == "ATTRIBUTES":
+        Keys += [x for x in [MeshData["Normal"],MeshData["Color"],MeshData["WBone"],MeshData["WWeight"]]+MeshData["UV"] if x is not None]
+    Rows = np.concatenate([np.ascontiguousarray(x).view(np.uint8).reshape(len(Pos),-1) for x in Keys],axis=1)
+    Rows = np.ascontiguousarray(Rows).view(np.dtype((np.void,Rows.shape[1]))).ravel()
+    _,First,Inverse = np.unique(Rows,return_index=True,return_inverse=True)
+    Order = np.argsort(First) # welded vertices keep the order of their first occurrence
+    Rank = np.empty_like(Order)
+    Rank[Order] = np.arange(len(Order))
+    First = First[Order]
+    Faces = Rank[Inverse.ravel()][MeshData["Faces"]]
+    Kept = kept_faces(Faces,len(First))
+    
+    MeshData["LoopSource"] = MeshData["Faces"][Kept].ravel().astype(np.int32)
+    MeshData["Faces"] = Faces[Kept].astype(np.int32)
+    if "MaterialIndex" in MeshData:
+        MeshData["MaterialIndex"] = MeshData["MaterialIndex"][Kept]
+    MeshData["WeldedFrom"] = len(Pos)
+    MeshData["Pos"] = Pos[First]
+    if MeshData["WBone"] is not None:
+        MeshData["WBone"] = MeshData["WBone"][First]
+        MeshData["WWeight"] = MeshData["WWeight"][First]
+    return MeshData
+
+def read_skeleton(SkelPath,UseYX):
+    with HedgeReader(SkelPath,'<') as Skel:
+        SkelParentingOffset = Skel.u32(0x48)+0x40
+        SkelParentingCount = Skel.u32(0x50)
+        SkelNameTable = Skel.u32(0x68)+0x40
+        SkelPosOffset = Skel.u32(0x88)+0x40
+        
+        Parents = Skel.array(SkelParentingOffset,'<i2',SkelParentingCount).tolist()
+        Names = [Skel.string(Skel.u32(SkelNameTable+x*0x10)+0x40) for x in range(SkelParentingCount)]
+        Transforms = Skel.array(SkelPosOffset,SkelTransformDtype,SkelParentingCount)
+        Pos = Transforms["Pos"].astype(np.float64)
+        Rot = Transforms["Rot"].astype(np.float64)
+        del Transforms
+    if UseYX:
+        Pos = Pos[:,[2,0,1]]
+        Rot = Rot[:,[3,2,0,1]]
+    else:
+        Rot = Rot[:,[3,0,1,2]]
+    return {"Names":Names,"Parents":Parents,"Pos":Pos,"Rot":Rot}
+
+def read_boneref_names(Model,BoneCount,BoneNameOffset):
+    BoneRef = []
+    for x in range(BoneCount):
+        tmpPointer = Model.u32(BoneNameOffset+x*4)+0x10
+        BoneRef.append(Model.string(Model.u32(tmpPointer+4)+0x10))
+    return BoneRef
+
+def strip2face(Indices):
+    # Expand every 0xFFFF separated strip at once, winding flips on every triangle from the start of its strip
+    if len(Indices) < 3:
+        return np.empty((0,3),dtype=np.int32)
+    Indices = Indices.astype(np.int32)
+    Restart = Indices == 0xFFFF
+    Positions = np.arange(len(Indices)-2)
+    StripStart = np.maximum.accumulate(np.where(Restart[:-2],Positions+1,0))
+    Flipped = ((Positions-StripStart) & 1).astype(bool)
+    A = Indices[:-2]
+    B = Indices[1:-1]
+    C = Indices[2:]
+    Keep = ~(Restart[:-2] | Restart[1:-1] | Restart[2:])
+    Keep &= (A != B) & (B != C) & (A != C) # degenerate joins between strips
+    FaceArray = np.where(Flipped[:,None],np.stack((B,C,A),axis=1),np.stack((C,B,A),axis=1))
+    return FaceArray[Keep]
+
+def vertex_dtype(VertSize,VertData):
+    # Big-endian view of one vertex, built from the VertData element table
+    Names = []
+    Formats = []
+    Offsets = []
+    def add_field(Name,Format,Element):
+        Names.append(Name)
+        Formats.append(Format)
+        Offsets.append(Element[0])
+    add_field("Pos",('>f4',3),VertData.get(0,[0]))
+    for x,Element in enumerate(UVElements):
+        if Element in VertData:
+            add_field("UV%d" % x,('>f2',2),VertData[Element])
+    Normals = VertData.get(0x30000)
+    if Normals and Normals[1] == 0x2A23B9:
+        add_field("Normal",('>f4',3),Normals)
+    elif Normals and Normals[1] == 0x2A2187:
+        add_field("Normal",'>u4',Normals)
+    if 0xA0000 in VertData:
+        add_field("Color",('u1',4),VertData[0xA0000])
+    for x,(BoneElement,WeightElement) in enumerate(WeightElements):
+        WBoneTable = VertData.get(BoneElement)
+        if not WBoneTable or WeightElement not in VertData:
+            break
+        if WBoneTable[1] == 0x1A225A:
+            add_field("WBone%d" % x,('>u2',4),WBoneTable)
+        else:
+            add_field("WBone%d" % x,('u1',4),WBoneTable)
+        add_field("WWeight%d" % x,('u1',4),VertData[WeightElement])
+    return np.dtype({"names":Names,"formats":Formats,"offsets":Offsets,"itemsize":VertSize})
+
+def decode_vertices(Model,VertChunkOffset,VertCount,VertSize,VertData):
+    VertDtype = vertex_dtype(VertSize,VertData)
+    Verts = Model.array(VertChunkOffset,VertDtype,VertCount)
+    
+    VertArrays = {"Pos":Verts["Pos"].astype(np.float32),"UV":[],"Normal":None,"Color":None,"WBone":None,"WWeight":None}
+    for x in range(len(UVElements)):
+        if "UV%d" % x in VertDtype.names:
+            UV = Verts["UV%d" % x].astype(np.float32)
+            UV[:,1] = 1-UV[:,1]
+            VertArrays["UV"].append(UV)
+        else:
+            VertArrays["UV"].append(None)
+    if "Normal" in VertDtype.names:
+        if VertDtype["Normal"].shape:
+            Normals = Verts["Normal"].astype(np.float64)
+        else:
+            Normals = ten_bit_normal_array(Verts["Normal"])
+        Length = np.sqrt(np.einsum('ij,ij->i',Normals,Normals))
+        np.divide(Normals,Length[:,None],out=Normals,where=Length[:,None]>0) # zero normals stay zero like Vector.normalized()
+        VertArrays["Normal"] = Normals.astype(np.float32)
+    if "Color" in VertDtype.names:
+        VertArrays["Color"] = (Verts["Color"][:,::-1]/255).astype(np.float32)
+    if "WBone0" in VertDtype.names:
+        Sets = range(2 if "WBone1" in VertDtype.names else 1) # four or eight influences
+        VertArrays["WBone"] = np.concatenate([Verts["WBone%d" % x] for x in Sets],axis=1).astype(np.int32)
+        VertArrays["WWeight"] = np.concatenate([Verts["WWeight%d" % x] for x in Sets],axis=1)
+    return VertArrays
+
+def ten_bit_normal_array(RawNorms):
+    Norms = np.empty((len(RawNorms),3),dtype=np.float64)
+    for x in range(3):
+        Component = (RawNorms >> (10*x)) & 0x3ff
+        Norms[:,x] = np.where(Component < 0x200,Component,Component.astype(np.int64)-0x400)/512
+    return Norms
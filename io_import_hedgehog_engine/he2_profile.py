@@ -0,0 +1,101 @@
+import json
+import time
+import contextlib
+import tracemalloc
+
+class NoProfile:
+    # Stand-in when profiling is off, stages cost one call and record nothing
+    File = None
+    Records = ()
+    
+    def stage(self,Stage,Submesh=None):
+        return contextlib.nullcontext()
+    
+    def fork(self,File):
+        return self
+    
+    def merge(self,Records):
+        pass
+    
+    def close(self):
+        pass
+
+NullProfile = NoProfile()
+
+class ImportProfile:
+    # Wall time per stage, plus tracemalloc peaks when Memory is set (Python 3.9+, tracing slows the import down)
+    def __init__(self,Memory=False,File=None):
+        self.Memory = Memory and hasattr(tracemalloc,"reset_peak")
+        self.File = File
+        self.Records = []
+        self.Stack = [] # [Base, Peak] of every open stage, so nested stages keep their parent's peak
+        self.Started = False
+    
+    def fork(self,File):
+        # Empty profile for one file, may be sent to a worker process and merged back
+        return ImportProfile(self.Memory,File)
+    
+    def merge(self,Records):
+        self.Records.extend(Records)
+    
+    @contextlib.contextmanager
+    def stage(self,Stage,Submesh=None):
+        if self.Memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.Started = True
+            self.update_parent()
+            tracemalloc.reset_peak()
+            self.Stack.append([tracemalloc.get_traced_memory()[0],0])
+        Start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Record = {"Stage":Stage,"File":self.File,"Submesh":Submesh,"Seconds":time.perf_counter()-Start,"PeakBytes":None}
+            if self.Memory:
+                Base,Peak = self.Stack.pop()
+                Record["PeakBytes"] = max(Peak,tracemalloc.get_traced_memory()[1]-Base)
+                self.update_parent()
+            self.Records.append(Record)
+    
+    def update_parent(self):
+        if self.Stack:
+            self.Stack[-1][1] = max(self.Stack[-1][1],tracemalloc.get_traced_memory()[1]-self.Stack[-1][0])
+    
+    def close(self):
+        if self.Started and not self.Stack:
+            tracemalloc.stop()
+            self.Started = False
+    
+    def totals(self,File=None):
+        Totals = {}
+        for Record in self.Records:
+            if File is not None and Record["File"] != File:
+                continue
+            Total = Totals.setdefault(Record["Stage"],{"Seconds":0.0,"PeakBytes":None,"Count":0})
+            Total["Seconds"] += Record["Seconds"]
+            Total["Count"] += 1
+            if Record["PeakBytes"] is not None:
+                Total["PeakBytes"] = max(Total["PeakBytes"] or 0,Record["PeakBytes"])
+        return Totals
+    
+    def summary(self):
+        Parts = []
+        for Stage,Total in sorted(self.totals().items(),key=lambda x: -x[1]["Seconds"]):
+            Text = "%s %.3fs" % (Stage,Total["Seconds"])
+            if Total["PeakBytes"] is not None:
+                Text += " (%.1f MB)" % (Total["PeakBytes"]/(1<<20))
+            Parts.append(Text)
+        return ", ".join(Parts)
+    
+    def write_traces(self):
+        # One <file>.trace.json next to every profiled file, returns the ones that could not be written
+        Failed = []
+        for File in dict.fromkeys(Record["File"] for Record in self.Records if Record["File"]):
+            Trace = {"File":File,"Totals":self.totals(File),"Records":[x for x in self.Records if x["File"] == File]}
+            try:
+                with open(File+".trace.json",'w') as f:
+                    json.dump(Trace,f,indent=1)
+            except OSError:
+                Failed.append(File)
+        return Failed